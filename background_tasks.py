@@ -0,0 +1,156 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from metrics import metrics
+
+log = logging.getLogger("timerapp.tasks")
+
+class BackgroundTask:
+    """Handle for work submitted to BackgroundTasks."""
+
+    def __init__(self, key, timeout, on_done, on_error):
+        self.key = key
+        self.deadline = time.monotonic() + timeout if timeout else None
+        self.on_done = on_done
+        self.on_error = on_error
+        self.cancel_event = threading.Event()
+        self.future = None
+
+    @property
+    def cancelled(self):
+        return self.cancel_event.is_set()
+
+    def cancel(self):
+        """Drops the task; work submitted with cancellable=True sees cancel_event set and stops early."""
+        self.cancel_event.set()
+        if self.future is not None:
+            self.future.cancel()
+
+class BackgroundTasks:
+    """Runs blocking I/O on worker threads and hands results back to Tk.
+
+    Workers never touch widgets. Their results are put on a queue that the
+    Tk main loop drains with root.after, so callbacks always run on the UI
+    thread and the timer keeps ticking while a query or download is slow.
+    """
+
+    def __init__(self, root, max_workers=4, poll_interval=50, on_busy_change=None):
+        self.root = root
+        self.poll_interval = poll_interval
+        self.on_busy_change = on_busy_change
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="timerapp-io")
+        self._results = queue.Queue()
+        self._pending = set()
+        self._by_key = {}
+        self._busy = False
+        self._closed = False
+        self._poll_id = self.root.after(self.poll_interval, self._drain)
+
+    def submit(self, func, *args, on_done=None, on_error=None, timeout=None, key=None, cancellable=False,
+               **kwargs):
+        """Runs func(*args, **kwargs) on a worker thread.
+
+        on_done receives the result and on_error the exception, both on the
+        Tk thread. A task with the same key as a pending one cancels it, so
+        repeated clicks only render the latest result. If timeout seconds
+        pass first, on_error gets a TimeoutError and the late result is
+        discarded. With cancellable=True func also receives the task's
+        cancel_event and is expected to check it between chunks of work.
+        """
+        if self._closed:
+            return None
+        if key is not None and key in self._by_key:
+            self._by_key.pop(key).cancel()
+        task = BackgroundTask(key, timeout, on_done, on_error)
+        if cancellable:
+            kwargs["cancel_event"] = task.cancel_event
+        task.future = self._executor.submit(self._run, task, func, args, kwargs)
+        self._pending.add(task)
+        if key is not None:
+            self._by_key[key] = task
+        self._set_busy()
+        return task
+
+    def post(self, func, *args):
+        """Schedules func(*args) on the Tk thread; safe to call from workers."""
+        self._results.put((None, func, args))
+
+    def cancel(self, key):
+        task = self._by_key.pop(key, None)
+        if task is not None:
+            task.cancel()
+
+    def shutdown(self):
+        """Cancels queued work and stops polling; running workers finish on their own."""
+        self._closed = True
+        for task in list(self._pending):
+            task.cancel()
+        self._pending.clear()
+        self._by_key.clear()
+        if self._poll_id is not None:
+            self.root.after_cancel(self._poll_id)
+            self._poll_id = None
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, task, func, args, kwargs):
+        if task.cancelled:
+            return
+        try:
+            result = func(*args, **kwargs)
+        except Exception as error:
+            self._results.put((task, task.on_error, (error,)))
+        else:
+            self._results.put((task, task.on_done, (result,)))
+
+    def _finish(self, task):
+        self._pending.discard(task)
+        if task.key is not None and self._by_key.get(task.key) is task:
+            del self._by_key[task.key]
+
+    def _drain(self):
+        try:
+            while True:
+                try:
+                    task, callback, args = self._results.get_nowait()
+                except queue.Empty:
+                    break
+                if task is not None:
+                    if task not in self._pending:
+                        continue  # zrušená alebo už vypršaná úloha
+                    self._finish(task)
+                    if task.cancelled:
+                        continue
+                if callback is not None:
+                    self._call(callback, args)
+
+            now = time.monotonic()
+            for task in [t for t in self._pending if t.cancelled or (t.deadline and now > t.deadline)]:
+                self._finish(task)
+                if not task.cancelled:
+                    task.cancel()
+                    if task.on_error is not None:
+                        self._call(task.on_error, (TimeoutError("Operation timed out"),))
+
+            self._set_busy()
+        finally:
+            # Polling musí pokračovať, inak by sa ďalšie výsledky už nikdy nedoručili
+            if not self._closed:
+                self._poll_id = self.root.after(self.poll_interval, self._drain)
+
+    def _call(self, callback, args):
+        """Runs a callback on the Tk thread; an exception is logged instead of stopping the drain."""
+        try:
+            with metrics.timer("ui_callback_ms"):
+                callback(*args)
+        except Exception:
+            metrics.inc("ui_callback_errors_total")
+            log.exception("Background task callback %r failed", callback)
+
+    def _set_busy(self):
+        busy = bool(self._pending)
+        if busy != self._busy:
+            self._busy = busy
+            if self.on_busy_change is not None:
+                self.on_busy_change(busy)
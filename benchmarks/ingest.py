@@ -0,0 +1,84 @@
+"""End-to-end run of ingest_daemon.py on localhost against the SQLite stand-in.
+
+Simulates many stations saving at shift change: each station thread posts
+its journal batches (and re-sends some of them, as a retry after a lost
+acknowledgement would). Checks that every record landed exactly once and
+prints throughput as JSON. Exit code 1 if rows are missing or duplicated.
+
+Spustenie:
+    python benchmarks/ingest.py --stations 40 --rows-per-station 2000
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from database import ConnectionPool, load_database_config, set_connection_pool, pooled_connection
+from ingest_daemon import IngestServer, post_records, check_health
+import sqlite_standin
+from run import make_rows, WAREHOUSE
+
+def station(url, station_id, rows_per_station, batch_size, errors):
+    rows = list(make_rows(rows_per_station, offset=station_id * rows_per_station))
+    for offset in range(0, len(rows), batch_size):
+        batch = rows[offset:offset + batch_size]
+        for attempt in range(2 if offset == 0 else 1):  # prvú dávku pošle dvakrát
+            while True:
+                try:
+                    post_records(url, batch)
+                    break
+                except ConnectionError as error:
+                    if "503" not in str(error):
+                        errors.append(str(error))
+                        return
+                    time.sleep(0.1)
+
+def main():
+    parser = argparse.ArgumentParser(description="Exercise the ingest daemon end to end.")
+    parser.add_argument("--stations", type=int, default=40)
+    parser.add_argument("--rows-per-station", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--max-pending-rows", type=int, default=20000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        path = os.path.join(workdir, "standin.db")
+        sqlite_standin.create_database(path)
+        set_connection_pool(ConnectionPool(load_database_config(), factory=sqlite_standin.connection_factory(path)))
+        server = IngestServer("127.0.0.1", 0, max_pending_rows=args.max_pending_rows).start()
+
+        errors = []
+        started = time.perf_counter()
+        threads = [threading.Thread(target=station,
+                                    args=(server.url, n, args.rows_per_station, args.batch_size, errors))
+                   for n in range(args.stations)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        status = check_health(server.url)
+        server.stop()
+
+        with pooled_connection() as connection:
+            cursor = connection.cursor()
+            cursor.execute("SELECT COUNT(*), COUNT(DISTINCT record_uid) FROM records WHERE warehouse = %s",
+                           (WAREHOUSE,))
+            stored, distinct = cursor.fetchone()
+            cursor.close()
+
+    expected = args.stations * args.rows_per_station
+    result = {"stations": args.stations, "expected_rows": expected, "stored_rows": stored,
+              "distinct_rows": distinct, "elapsed_s": elapsed, "rows_per_s": expected / elapsed,
+              "daemon": status, "errors": errors[:10]}
+    print(json.dumps(result, indent=2))
+    sys.exit(0 if stored == distinct == expected and not errors else 1)
+
+if __name__ == "__main__":
+    main()
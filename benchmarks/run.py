@@ -0,0 +1,316 @@
+"""Headless benchmark suite for the save, query, export, timer and startup paths.
+
+Runs against an SQLite stand-in (default) or the MySQL server configured by
+TIMERAPP_DB_* / db_config.json, and writes all results to one JSON file so
+runs can be compared. The timer, multitimer and startup benchmarks need a
+display; on a server run the suite under xvfb-run, otherwise they are
+reported as skipped. Any other failure is recorded as "failed" and makes
+the run exit with code 1.
+
+Spustenie:
+    xvfb-run python benchmarks/run.py --output bench.json
+    xvfb-run python benchmarks/run.py --output new.json --compare bench.json
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import queue
+import random
+import resource
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from database import (ConnectionPool, load_database_config, set_connection_pool, pooled_connection,
+                      insert_records_in_chunks, RecordPager)
+from record_store import format_duration
+import sqlite_standin
+import startup
+
+WAREHOUSE = "Benchmark"
+CLIENTS = ["Mustard", "Musango", "Mousssee", "Trepadora", "Sarah"]
+ACTIVITIES = ["Packing", "Work", "Other"]
+SECTIONS = ("save", "reads", "export", "tick", "multitimer", "startup")
+GENERATE_BLOCK = 100000      # riadky sa generujú po blokoch, aby 1M riadkov nezabralo celú RAM
+REGRESSION_TOLERANCE = 1.2
+EXPORT_TIMEOUT = 1800        # sekundy na jeden export, potom sa proces ukončí ako zlyhaný
+EXPORT_WRITERS = ("xlsxwriter", "pyarrow")    # chýbajúca knižnica formátu je skip, nie zlyhanie
+
+def make_rows(count, offset=0, seed=42):
+    """Yields synthetic rows in insert_records_in_chunks order."""
+    rng = random.Random(seed + offset)
+    start = datetime(2024, 1, 1)
+    for index in range(offset, offset + count):
+        duration_ms = rng.randint(1000, 3600000)
+        yield (f"bench{index:026d}", (start + timedelta(seconds=index * 30)).strftime("%Y-%m-%d %H:%M:%S"),
+               CLIENTS[index % len(CLIENTS)], ACTIVITIES[index % len(ACTIVITIES)],
+               format_duration(duration_ms), duration_ms, WAREHOUSE, 0)
+
+def setup_backend(backend, workdir):
+    """Installs a connection pool for the chosen backend and returns its description."""
+    config = load_database_config()
+    if backend == "sqlite":
+        path = os.path.join(workdir, "standin.db")
+        if not os.path.exists(path):
+            sqlite_standin.create_database(path)
+        set_connection_pool(ConnectionPool(config, factory=sqlite_standin.connection_factory(path)))
+        return {"backend": "sqlite", "path": path}
+    set_connection_pool(ConnectionPool(config))
+    return {"backend": "mysql", "host": config["host"], "database": config["database"]}
+
+def clear_rows():
+    with pooled_connection() as connection:
+        cursor = connection.cursor()
+        cursor.execute("DELETE FROM records WHERE warehouse = %s", (WAREHOUSE,))
+        connection.commit()
+        cursor.close()
+
+def seed_rows(count):
+    """Inserts count synthetic rows; returns (seconds, rows/s)."""
+    elapsed = 0.0
+    with pooled_connection() as connection:
+        for offset in range(0, count, GENERATE_BLOCK):
+            block = list(make_rows(min(GENERATE_BLOCK, count - offset), offset))
+            started = time.perf_counter()
+            insert_records_in_chunks(connection, block)
+            elapsed += time.perf_counter() - started
+    return elapsed, count / elapsed if elapsed else 0.0
+
+def bench_save(sizes):
+    results = {}
+    for size in sizes:
+        clear_rows()
+        elapsed, rate = seed_rows(size)
+        results[str(size)] = {"elapsed_s": elapsed, "rows_per_s": rate}
+        print(f"save {size}: {elapsed:.2f}s ({rate:.0f} rows/s)")
+    return results
+
+def drain(clients):
+    pager = RecordPager(WAREHOUSE, clients)
+    started = time.perf_counter()
+    first_page = pager.fetch_page()
+    first_page_ms = (time.perf_counter() - started) * 1000
+    while not pager.exhausted:
+        pager.fetch_page()
+    return {"first_page_ms": first_page_ms, "all_pages_ms": (time.perf_counter() - started) * 1000,
+            "rows": pager.rows_fetched, "page_rows": len(first_page)}
+
+def bench_reads(rows):
+    clear_rows()
+    seed_rows(rows)
+    results = {
+        "show_client_records": drain([CLIENTS[0]]),
+        "show_all_messages": drain(sorted(CLIENTS)),
+    }
+    for name, result in results.items():
+        print(f"{name}: first page {result['first_page_ms']:.1f}ms, all {result['all_pages_ms']:.0f}ms")
+    return results
+
+def export_child(backend, workdir, path, results):
+    """Runs one export in a fresh process so its peak RSS is measured alone."""
+    try:
+        from exporter import export_rows, stream_history
+        setup_backend(backend, workdir)
+        started = time.perf_counter()
+        written = export_rows(stream_history(WAREHOUSE, datetime(2000, 1, 1), datetime(2100, 1, 1)),
+                              path, WAREHOUSE)
+    except Exception as error:
+        if isinstance(error, ModuleNotFoundError) and error.name in EXPORT_WRITERS:
+            results.put({"skipped": str(error)})
+        else:
+            results.put({"failed": f"{type(error).__name__}: {error}"})
+        return
+    results.put({"elapsed_s": time.perf_counter() - started, "rows": written,
+                 "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+                 "file_bytes": os.path.getsize(path)})
+
+def wait_for_child(process, results, timeout):
+    """Returns the child's result, or a failure if it dies or runs past timeout without one."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            return results.get(timeout=1)
+        except queue.Empty:
+            if not process.is_alive():
+                # Proces mohol výsledok odoslať tesne pred skončením
+                try:
+                    return results.get(timeout=1)
+                except queue.Empty:
+                    return {"failed": f"export process exited with code {process.exitcode}"}
+    process.terminate()
+    return {"failed": f"export did not finish within {timeout}s"}
+
+def bench_export(backend, workdir, rows):
+    """Only a missing writer library is a skip; any other failed format is reported under "failed"."""
+    clear_rows()
+    seed_rows(rows)
+    context = multiprocessing.get_context("spawn")
+    results = {}
+    for extension in ("xlsx", "csv", "parquet"):
+        results_queue = context.Queue()
+        process = context.Process(target=export_child,
+                                  args=(backend, workdir, os.path.join(workdir, f"export.{extension}"),
+                                        results_queue))
+        process.start()
+        results[extension] = wait_for_child(process, results_queue, EXPORT_TIMEOUT)
+        process.join()
+        print(f"export {extension}: {results[extension]}")
+    failed = [f"{extension}: {result['failed']}" for extension, result in results.items() if "failed" in result]
+    if failed:
+        results["failed"] = "; ".join(failed)
+    return results
+
+def bench_tick(seconds):
+    """Runs the real TickLoop on a Tk label and returns its jitter stats."""
+    import tkinter as tk
+    from stopwatch import Stopwatch, TickLoop
+    try:
+        root = tk.Tk()
+    except tk.TclError as error:
+        return {"skipped": str(error)}
+    label = tk.Label(root, font=("Helvetica", 48))
+    label.pack()
+    stopwatch = Stopwatch()
+    cpu_started = time.process_time()
+    loop = TickLoop(root, lambda: label.config(text=format_duration(stopwatch.elapsed_ms())))
+    stopwatch.start()
+    loop.start()
+    root.after(int(seconds * 1000), root.quit)
+    root.mainloop()
+    loop.stop()
+    stats = loop.stats()
+    stats["cpu_percent"] = 100 * (time.process_time() - cpu_started) / seconds
+    root.destroy()
+    print(f"tick: {stats}")
+    return stats
+
+def bench_multi_timer(count, visible, seconds):
+    """Runs count timers on one TimerBoard with only `visible` rows on screen; returns loop stats."""
+    import tkinter as tk
+    from multi_timer import TimerBoard
+    try:
+        root = tk.Tk()
+    except tk.TclError as error:
+        return {"skipped": str(error)}
+    board = TimerBoard(root)
+    for index in range(count):
+        label = tk.Label(root, font=("Helvetica", 16))
+        if index < visible:
+            label.pack()
+        board.start(board.add(CLIENTS[index % len(CLIENTS)], ACTIVITIES[index % len(ACTIVITIES)], label))
+    board.set_visible(0, visible / count)
+    cpu_started = time.process_time()
+    root.after(int(seconds * 1000), root.quit)
+    root.mainloop()
+    board.stop_all()
+    stats = board.tick_loop.stats()
+    stats.update(timers=count, visible=visible, cpu_percent=100 * (time.process_time() - cpu_started) / seconds)
+    root.destroy()
+    print(f"multitimer: {stats}")
+    return stats
+
+def display_error():
+    """Returns why Tk cannot open a window here, or None if it can."""
+    import tkinter as tk
+    try:
+        tk.Tk().destroy()
+    except tk.TclError as error:
+        return str(error)
+    return None
+
+def bench_startup(runs):
+    """Only a missing display is a skip; a probe that crashes is recorded as a failure."""
+    error = display_error()
+    if error:
+        return {"skipped": error}
+    try:
+        return startup.measure_startup(runs)
+    except RuntimeError as error:
+        print(f"startup: {error}", file=sys.stderr)
+        return {"failed": str(error).splitlines()[-1]}
+
+def flatten(results, prefix=""):
+    for key, value in results.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            yield from flatten(value, f"{name}.")
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            yield name, value
+
+def compare(current, baseline):
+    """Prints timing metrics that changed and returns the names of regressions."""
+    old = dict(flatten(baseline["results"]))
+    regressions = []
+    for name, value in flatten(current["results"]):
+        if name not in old or not old[name]:
+            continue
+        higher_is_better = name.endswith("rows_per_s")
+        if not (higher_is_better or name.endswith(("_s", "_ms", "_kb"))):
+            continue
+        ratio = old[name] / value if higher_is_better and value else value / old[name]
+        marker = "REGRESSION" if ratio > REGRESSION_TOLERANCE else ""
+        print(f"{name}: {old[name]:.3f} -> {value:.3f} ({ratio:.2f}x) {marker}")
+        if marker:
+            regressions.append(name)
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the TimerApp benchmark suite.")
+    parser.add_argument("--backend", choices=("sqlite", "mysql"), default="sqlite")
+    parser.add_argument("--sizes", default="1000,100000,1000000", help="save benchmark row counts")
+    parser.add_argument("--read-rows", type=int, default=100000)
+    parser.add_argument("--export-rows", type=int, default=100000)
+    parser.add_argument("--tick-seconds", type=float, default=5)
+    parser.add_argument("--timers", type=int, default=60, help="timers in the multitimer benchmark")
+    parser.add_argument("--visible-timers", type=int, default=15)
+    parser.add_argument("--startup-runs", type=int, default=3)
+    parser.add_argument("--only", default=",".join(SECTIONS), help="comma-separated sections to run")
+    parser.add_argument("--output", default=f"bench-{datetime.now():%Y%m%d-%H%M%S}.json")
+    parser.add_argument("--compare", help="previous result JSON; exit 1 on regressions")
+    args = parser.parse_args()
+    sections = args.only.split(",")
+
+    with tempfile.TemporaryDirectory() as workdir:
+        backend = setup_backend(args.backend, workdir)
+        results = {}
+        if "save" in sections:
+            results["save"] = bench_save([int(size) for size in args.sizes.split(",")])
+        if "reads" in sections:
+            results["reads"] = bench_reads(args.read_rows)
+        if "export" in sections:
+            results["export"] = bench_export(args.backend, workdir, args.export_rows)
+        if "tick" in sections:
+            results["tick"] = bench_tick(args.tick_seconds)
+        if "multitimer" in sections:
+            results["multitimer"] = bench_multi_timer(args.timers, args.visible_timers, args.tick_seconds)
+        if "startup" in sections:
+            results["startup"] = bench_startup(args.startup_runs)
+        if args.backend == "mysql":
+            clear_rows()
+
+    report = {
+        "meta": {"timestamp": datetime.now().isoformat(timespec="seconds"), "python": platform.python_version(),
+                 "platform": platform.platform(), **backend},
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=2)
+    print(f"Results written to '{args.output}'")
+
+    failed = [name for name, result in results.items() if "failed" in result]
+    for name in failed:
+        print(f"FAILED: {name}: {results[name]['failed']}", file=sys.stderr)
+    regressions = []
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            regressions = compare(report, json.load(file))
+    sys.exit(1 if regressions or failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""SQLite stand-in for the MySQL server, used by the benchmark suite.
+
+It speaks just enough of the mysql.connector connection/cursor API for
+database.py: %s parameters, cursor(buffered=...), ping() and the
+INSERT ... ON DUPLICATE KEY UPDATE upsert used for records.
+"""
+import re
+import sqlite3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    record_uid TEXT UNIQUE,
+    datetime TEXT NOT NULL,
+    client TEXT NOT NULL,
+    activity TEXT NOT NULL,
+    duration TEXT NOT NULL,
+    duration_ms INTEGER,
+    warehouse TEXT NOT NULL,
+    deleted INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_records_warehouse_client_datetime ON records (warehouse, client, datetime);
+CREATE INDEX IF NOT EXISTS idx_records_warehouse_datetime ON records (warehouse, datetime);
+"""
+
+_VALUES_REF = re.compile(r"VALUES\((\w+)\)")
+
+def translate(query):
+    """Rewrites the MySQL dialect used by database.py into SQLite."""
+    query = query.replace("%s", "?")
+    if "ON DUPLICATE KEY UPDATE" in query:
+        query = query.replace("ON DUPLICATE KEY UPDATE", "ON CONFLICT(record_uid) DO UPDATE SET")
+        query = _VALUES_REF.sub(r"excluded.\1", query)
+    return query
+
+class StandinCursor:
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    def execute(self, query, params=()):
+        self._cursor.execute(translate(query), params)
+
+    def executemany(self, query, rows):
+        self._cursor.executemany(translate(query), rows)
+
+    def fetchone(self):
+        return self._cursor.fetchone()
+
+    def fetchmany(self, size):
+        return self._cursor.fetchmany(size)
+
+    def fetchall(self):
+        return self._cursor.fetchall()
+
+    def close(self):
+        self._cursor.close()
+
+class StandinConnection:
+    def __init__(self, path):
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+
+    def cursor(self, buffered=None):
+        return StandinCursor(self._db.cursor())
+
+    def ping(self, reconnect=False):
+        self._db.execute("SELECT 1")
+
+    def is_connected(self):
+        return True
+
+    def commit(self):
+        self._db.commit()
+
+    def rollback(self):
+        self._db.rollback()
+
+    def close(self):
+        self._db.close()
+
+def create_database(path):
+    """Creates the records schema in a fresh SQLite file."""
+    db = sqlite3.connect(path)
+    db.executescript(SCHEMA)
+    db.commit()
+    db.close()
+
+def connection_factory(path):
+    return lambda: StandinConnection(path)
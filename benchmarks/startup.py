@@ -0,0 +1,107 @@
+"""Startup benchmark: time to first frame of TimerApp.
+
+Each run starts a fresh interpreter with -X importtime, builds the main
+window and closes it as soon as the first frame is drawn, without running
+the deferred startup work. The benchmark fails (exit code 1) if the median
+exceeds the budget, if it regressed against a saved baseline, or if a
+heavy module was imported before the first frame.
+
+Spustenie (na serveri bez displeja cez xvfb-run):
+    python benchmarks/startup.py --runs 5 --budget 1.0 --baseline startup.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ("pandas", "numpy", "mysql.connector", "requests", "PIL", "xlsxwriter", "pyarrow")
+REGRESSION_TOLERANCE = 1.2   # povolené spomalenie oproti baseline
+
+PROBE = """
+import sys, json
+import tkinter as tk
+from timer_app import TimerApp
+TimerApp.deferred_startup = lambda self: None  # meria sa len prvý frame, nie práca po ňom
+root = tk.Tk()
+app = TimerApp(root, "Benchmark")
+root.update()
+print(json.dumps({"heavy": [m for m in %r if m in sys.modules]}), flush=True)
+app.on_close()
+""" % (HEAVY_MODULES,)
+
+def parse_importtime(stderr, top=10):
+    """Returns the slowest imports as (module, cumulative microseconds)."""
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _self_us, cumulative_us, module = line[len("import time:"):].split("|")
+        imports.append((module.strip(), int(cumulative_us)))
+    return sorted(imports, key=lambda item: item[1], reverse=True)[:top]
+
+def run_once(workdir):
+    env = dict(os.environ,
+               TIMERAPP_JOURNAL=os.path.join(workdir, "journal.db"),
+               TIMERAPP_LOG=os.path.join(workdir, "timerapp.log"))
+    started = time.perf_counter()
+    process = subprocess.Popen([sys.executable, "-X", "importtime", "-c", PROBE], cwd=REPO_DIR, env=env,
+                               stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    first_line = process.stdout.readline()
+    first_frame = time.perf_counter() - started
+    _stdout, stderr = process.communicate()
+    if process.returncode != 0 or not first_line:
+        raise RuntimeError(f"Startup probe failed:\n{stderr[-2000:]}")
+    return first_frame, json.loads(first_line)["heavy"], stderr
+
+def measure_startup(runs=5):
+    """Returns a JSON-serialisable dict with time-to-first-frame statistics."""
+    times = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for _ in range(runs):
+            first_frame, heavy, stderr = run_once(workdir)
+            times.append(first_frame)
+    return {
+        "runs": runs,
+        "first_frame_median_s": statistics.median(times),
+        "first_frame_min_s": min(times),
+        "first_frame_max_s": max(times),
+        "heavy_modules_at_first_frame": heavy,
+        "slowest_imports_us": parse_importtime(stderr),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure TimerApp time to first frame.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget", type=float, default=1.0, help="maximum median seconds to first frame")
+    parser.add_argument("--baseline", help="JSON from a previous run; fail if slower by more than 20%%")
+    parser.add_argument("--output", help="write the result JSON here")
+    args = parser.parse_args()
+
+    result = measure_startup(args.runs)
+    print(json.dumps(result, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(result, file, indent=2)
+
+    failures = []
+    median = result["first_frame_median_s"]
+    if median > args.budget:
+        failures.append(f"median {median:.3f}s exceeds budget {args.budget:.3f}s")
+    if args.baseline and os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as file:
+            baseline = json.load(file)["first_frame_median_s"]
+        if median > baseline * REGRESSION_TOLERANCE:
+            failures.append(f"median {median:.3f}s regressed from baseline {baseline:.3f}s")
+    if result["heavy_modules_at_first_frame"]:
+        failures.append("imported before first frame: " + ", ".join(result["heavy_modules_at_first_frame"]))
+    for failure in failures:
+        print(f"FAIL: {failure}", file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""End-to-end run of the updater against a local HTTP server serving fake releases.
+
+Checks ETag revalidation (second check gets 304), a resumed Range download,
+SHA-256 rejection of a corrupted archive, that only changed files are
+staged and swapped into a scratch copy of the app, and that a swap cut
+short is finished on the next start or rolled back on error. Exit code 1
+on failure.
+
+Spustenie:
+    python benchmarks/updater.py
+"""
+import hashlib
+import io
+import json
+import os
+import sys
+import tempfile
+import threading
+import zipfile
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+import update_checker
+
+class FakeReleases(BaseHTTPRequestHandler):
+    """Serves /release (with ETag) and /archive.zip (with Range support)."""
+    files = {}
+    requests = []
+
+    def do_GET(self):
+        self.requests.append((self.path, self.headers.get("If-None-Match"), self.headers.get("Range")))
+        body = self.files.get(self.path)
+        if body is None:
+            self.send_error(404)
+            return
+        etag = '"%s"' % hashlib.sha256(body).hexdigest()[:16]
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        status, start = 200, 0
+        if self.headers.get("Range"):
+            start = int(self.headers["Range"].split("=")[1].rstrip("-"))
+            if start >= len(body):
+                self.send_error(416)
+                return
+            status = 206
+        self.send_response(status)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body) - start))
+        self.end_headers()
+        self.wfile.write(body[start:])
+
+    def log_message(self, format, *args):
+        pass
+
+def build_archive(files):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for name, content in files.items():
+            archive.writestr(f"TimerApp-v9.9.9/{name}", content)
+    return buffer.getvalue()
+
+def main():
+    failures = []
+    def check(condition, message):
+        print(("ok   " if condition else "FAIL ") + message)
+        if not condition:
+            failures.append(message)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        app_dir = os.path.join(workdir, "app")
+        os.makedirs(app_dir)
+        for name, content in {"main.py": b"old main", "database.py": b"same db"}.items():
+            with open(os.path.join(app_dir, name), "wb") as file:
+                file.write(content)
+        archive = build_archive({"main.py": b"new main", "database.py": b"same db", "extra/new.py": b"added"})
+        sha256 = hashlib.sha256(archive).hexdigest()
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), FakeReleases)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base = f"http://127.0.0.1:{server.server_address[1]}"
+        FakeReleases.files = {
+            "/archive.zip": archive,
+            "/release": json.dumps({"tag_name": "v9.9.9", "zipball_url": f"{base}/archive.zip",
+                                    "body": f"Fixes.\nsha256: {sha256}\n", "assets": []}).encode(),
+        }
+        update_checker.UPDATE_DIR = os.path.join(workdir, "update")
+        api_url = f"{base}/release"
+
+        update_checker.UPDATE_API_URL = api_url
+        check(update_checker.check_for_update("v1.0.0") == "v9.9.9", "first check finds the new release")
+        check(update_checker.check_for_update("v1.0.0") == "v9.9.9", "second check reuses the cached release")
+        check(FakeReleases.requests[-1][1] is not None, "second check sent If-None-Match")
+
+        zip_path = os.path.join(workdir, "archive.zip")
+        with open(zip_path + ".part", "wb") as file:
+            file.write(archive[:100])
+        update_checker.download_file(f"{base}/archive.zip", zip_path, sha256)
+        check(FakeReleases.requests[-1][2] == "bytes=100-", "partial download resumed with a Range request")
+        with open(zip_path, "rb") as file:
+            check(file.read() == archive, "resumed download matches the archive")
+
+        corrupted_path = os.path.join(workdir, "corrupted.zip")
+        with open(corrupted_path + ".part", "wb") as file:
+            file.write(b"corrupted")
+        try:
+            update_checker.download_file(f"{base}/archive.zip", corrupted_path, sha256)
+            check(False, "corrupted download is rejected")
+        except update_checker.UpdateError:
+            check(not os.path.exists(corrupted_path + ".part") and not os.path.exists(corrupted_path),
+                  "corrupted download is rejected and deleted")
+
+        changed = update_checker.install_update(app_dir=app_dir, api_url=api_url)
+        check(sorted(changed) == ["extra/new.py", "main.py"], f"only changed files staged: {changed}")
+        with open(os.path.join(app_dir, "main.py"), "rb") as file:
+            check(file.read() == b"new main", "changed file swapped in")
+        check(os.path.exists(os.path.join(app_dir, "extra", "new.py")), "new file added")
+
+        def read(name):
+            with open(os.path.join(app_dir, name), "rb") as file:
+                return file.read()
+
+        def apply_failing_after_first_file(contents, failure):
+            """Stages contents and applies them, failing with `failure` on the second swapped file."""
+            zip_path = os.path.join(workdir, "next.zip")
+            with open(zip_path, "wb") as file:
+                file.write(build_archive(contents))
+            staging_dir = os.path.join(update_checker.UPDATE_DIR, "staging")
+            changed = update_checker.stage_update(zip_path, staging_dir, app_dir)
+            real_replace, moved = os.replace, []
+            def failing_replace(source, target):
+                if source.startswith(staging_dir):
+                    if moved:
+                        raise failure
+                    moved.append(target)
+                real_replace(source, target)
+            os.replace = failing_replace
+            try:
+                update_checker.apply_staged_update(staging_dir, changed, app_dir)
+            except (OSError, SystemExit):
+                pass
+            finally:
+                os.replace = real_replace
+
+        manifest = os.path.join(update_checker.UPDATE_DIR, update_checker.SWAP_MANIFEST)
+        apply_failing_after_first_file({"main.py": b"next main", "database.py": b"next db"},
+                                       SystemExit("simulated power cut"))
+        check(os.path.exists(manifest), "interrupted swap leaves its manifest")
+        check(update_checker.recover_interrupted_update() == "finished", "interrupted swap is finished on startup")
+        check(read("main.py") == b"next main" and read("database.py") == b"next db", "both files swapped in")
+
+        apply_failing_after_first_file({"main.py": b"broken main", "database.py": b"broken db"},
+                                       OSError("disk full"))
+        check(read("main.py") == b"next main" and read("database.py") == b"next db",
+              "failed swap rolled back")
+        check(not os.path.exists(manifest), "no manifest left after rollback")
+        server.shutdown()
+
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+import logging
+import os
+import queue
+import tkinter as tk
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from metrics import metrics
+
+CONSOLE_MAX_LINES = int(os.environ.get("TIMERAPP_CONSOLE_LINES", 2000))
+LOG_PATH = os.environ.get(
+    "TIMERAPP_LOG", os.path.join(os.path.dirname(os.path.abspath(__file__)), "timerapp.log"))
+LOG_MAX_BYTES = 5 * 1024 * 1024
+LOG_BACKUPS = 5
+FLUSH_INTERVAL = 16          # ms, približne jeden snímok
+
+# Farba správy -> (tag v konzole, úroveň v log súbore)
+SEVERITIES = {
+    "white": ("info", logging.INFO),
+    "green": ("success", logging.INFO),
+    "red": ("error", logging.ERROR),
+}
+
+class ConsoleLog:
+    """Bounded, batched backend for the console Text widget.
+
+    Lines are queued and inserted once per frame, each severity has its own
+    tag configured up front, and the widget never holds more than max_lines
+    lines. Timestamped messages also go to a rotating log file, written by
+    a QueueListener thread so the UI never waits on disk.
+    """
+
+    def __init__(self, root, widget, max_lines=CONSOLE_MAX_LINES, log_path=LOG_PATH):
+        self.root = root
+        self.widget = widget
+        self.max_lines = max_lines
+        self._pending = []
+        self._scroll = False
+        self._flush_id = None
+        for color, (tag, _level) in SEVERITIES.items():
+            self.widget.tag_configure(tag, foreground=color)
+
+        self.logger = logging.getLogger("timerapp.console")
+        self.logger.setLevel(logging.INFO)
+        self.logger.propagate = False
+        self._listener = None
+        if log_path:
+            log_queue = queue.SimpleQueue()
+            file_handler = RotatingFileHandler(log_path, maxBytes=LOG_MAX_BYTES,
+                                               backupCount=LOG_BACKUPS, encoding="utf-8")
+            file_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(message)s"))
+            self.logger.addHandler(QueueHandler(log_queue))
+            self._listener = QueueListener(log_queue, file_handler)
+            self._listener.start()
+
+    def write(self, message, color="white"):
+        """Queues a timestamped message, scrolls to it and logs it to the file."""
+        tag, level = SEVERITIES.get(color, SEVERITIES["white"])
+        self.logger.log(level, message)
+        self._queue(f"{datetime.now().strftime('%H:%M:%S')} - {message}\n", tag, scroll=True)
+
+    def insert(self, text, color="white"):
+        """Queues raw console text without scrolling or logging (record listings)."""
+        self._queue(text, SEVERITIES.get(color, SEVERITIES["white"])[0], scroll=False)
+
+    def clear(self):
+        self._pending.clear()
+        self.widget.delete(1.0, tk.END)
+
+    def flush(self):
+        if self._flush_id is not None:
+            self.root.after_cancel(self._flush_id)
+            self._flush_id = None
+        if not self._pending:
+            return
+        # Susedné riadky s rovnakým tagom sa vložia jedným volaním
+        args = []
+        for text, tag in self._pending:
+            if args and args[-1] == (tag,):
+                args[-2] += text
+            else:
+                args.extend((text, (tag,)))
+        metrics.inc("console_lines_total", len(self._pending))
+        self._pending.clear()
+        with metrics.timer("console_flush_ms"):
+            self.widget.insert(tk.END, *args)
+
+        excess = int(self.widget.index("end-1c").split(".")[0]) - 1 - self.max_lines
+        if excess > 0:
+            self.widget.delete("1.0", f"{excess + 1}.0")
+        if self._scroll:
+            self._scroll = False
+            self.widget.see(tk.END)
+
+    def close(self):
+        if self._flush_id is not None:
+            self.root.after_cancel(self._flush_id)
+            self._flush_id = None
+        if self._listener is not None:
+            self._listener.stop()
+            self._listener = None
+
+    def _queue(self, text, tag, scroll):
+        self._pending.append((text, tag))
+        self._scroll = self._scroll or scroll
+        if self._flush_id is None:
+            self._flush_id = self.root.after(FLUSH_INTERVAL, self.flush)
@@ -1,10 +1,340 @@
-import mysql.connector
+import json
+import os
+import threading
+import time
+from concurrent.futures import CancelledError
+from contextlib import contextmanager
+from metrics import metrics
 
-def get_database_connection():
+INSERT_CHUNK_SIZE = 500      # Počet riadkov v jednej dávke (jeden INSERT + commit)
+INSERT_CHUNK_RETRIES = 1     # Koľkokrát sa zopakuje dávka, ktorá narazila na deadlock alebo zámok
+RETRYABLE_ERRNOS = (1205, 1213)  # ER_LOCK_WAIT_TIMEOUT, ER_LOCK_DEADLOCK: na tom istom spojení môžu uspieť
+RECORDS_PAGE_SIZE = 200      # Počet riadkov načítaných naraz pri prehliadaní záznamov
+
+# Predvolené nastavenia pripojenia; prepíše ich db_config.json vedľa programu
+# alebo premenné prostredia TIMERAPP_DB_* (napr. TIMERAPP_DB_HOST).
+# Meno a heslo nemajú predvolenú hodnotu, musia prísť z jedného z nich.
+DB_DEFAULTS = {
+    "host": "localhost",
+    "user": "",
+    "password": "",
+    "database": "moja_databaza",
+    "port": 3306,
+    "connect_timeout": 5,
+    "pool_size": 4,
+    "pool_timeout": 10,
+    "ingest_url": "",        # ak je nastavené, záznamy sa posielajú cez ingest_daemon.py
+}
+
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "db_config.json")
+
+def load_database_config(path=None):
+    """Returns connection settings merged from defaults, config file and environment."""
+    config = dict(DB_DEFAULTS)
+    path = path or os.environ.get("TIMERAPP_DB_CONFIG", CONFIG_PATH)
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as file:
+            config.update(json.load(file))
+    for key, default in DB_DEFAULTS.items():
+        value = os.environ.get(f"TIMERAPP_DB_{key.upper()}")
+        if value is not None:
+            config[key] = type(default)(value)
+    return config
+
+class RecordsRejected(Exception):
+    """The rows themselves were refused (e.g. by the ingest daemon); resending them cannot succeed."""
+
+def is_data_error(error):
+    """True if the rows were rejected for their data rather than for a lost or busy connection."""
+    if isinstance(error, RecordsRejected):
+        return True
+    try:
+        import mysql.connector
+    except ImportError:
+        return False
+    return isinstance(error, (mysql.connector.DataError, mysql.connector.IntegrityError))
+
+class DatabaseConfigError(Exception):
+    """The connection settings are incomplete."""
+
+def require_credentials(config):
+    missing = [key for key in ("user", "password") if not config[key]]
+    if missing:
+        raise DatabaseConfigError(
+            f"Database {' and '.join(missing)} not configured: add to db_config.json or set "
+            + " and ".join(f"TIMERAPP_DB_{key.upper()}" for key in missing))
+
+def get_database_connection(config=None):
+    """Opens a new, unpooled MySQL connection."""
+    import mysql.connector
+    config = config or load_database_config()
+    require_credentials(config)
     return mysql.connector.connect(
-        host="localhost",           # Host je "localhost", pretože ide o lokálny server
-        user="root",                # Používateľské meno je "root"
-        password="warcraft3",                # Heslo je prázdne (ak ste nenastavili heslo pri inštalácii MySQL)
-        database="moja_databaza",   # Názov databázy, ktorú ste vytvorili
-        port=3306                   # Štandardný port pre MySQL
+        host=config["host"],
+        user=config["user"],
+        password=config["password"],
+        database=config["database"],
+        port=config["port"],
+        connection_timeout=config["connect_timeout"],
     )
+
+class ConnectionPool:
+    """Bounded pool of MySQL connections shared by the whole process."""
+
+    def __init__(self, config=None, factory=None):
+        self.config = config or load_database_config()
+        self.max_size = int(self.config["pool_size"])
+        self.timeout = float(self.config["pool_timeout"])
+        self.factory = factory or (lambda: get_database_connection(self.config))
+        self._idle = []
+        self._size = 0
+        self._lock = threading.Condition()
+        self.stats = {"checkouts": 0, "waits": 0, "creations": 0, "reconnects": 0, "discards": 0}
+
+    def _is_healthy(self, connection):
+        try:
+            connection.ping(reconnect=False)
+            return True
+        except Exception:
+            return False
+
+    def acquire(self):
+        """Borrows a healthy connection, opening one if the pool is not full."""
+        import mysql.connector
+        deadline = time.monotonic() + self.timeout
+        with self._lock:
+            self.stats["checkouts"] += 1
+            while True:
+                if self._idle:
+                    connection = self._idle.pop()
+                    break
+                if self._size < self.max_size:
+                    self._size += 1
+                    connection = None
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise mysql.connector.errors.PoolError("Timed out waiting for a database connection")
+                self.stats["waits"] += 1
+                metrics.inc("pool_waits_total")
+                self._lock.wait(remaining)
+
+        # Sieťové operácie prebiehajú mimo zámku, aby neblokovali ostatné vlákna
+        try:
+            if connection is None:
+                with metrics.timer("db_connect_ms"):
+                    connection = self.factory()
+                metrics.inc("db_connections_opened_total")
+                with self._lock:
+                    self.stats["creations"] += 1
+            elif not self._is_healthy(connection):
+                self._close_quietly(connection)
+                with metrics.timer("db_connect_ms"):
+                    connection = self.factory()
+                metrics.inc("db_connections_opened_total")
+                with self._lock:
+                    self.stats["reconnects"] += 1
+        except Exception:
+            self._release_slot()
+            raise
+        return connection
+
+    def release(self, connection, discard=False):
+        """Returns a borrowed connection; broken ones are closed instead."""
+        if not discard:
+            try:
+                connection.rollback()
+            except Exception:
+                discard = True
+        if discard:
+            self._close_quietly(connection)
+            with self._lock:
+                self.stats["discards"] += 1
+            self._release_slot()
+            return
+        with self._lock:
+            self._idle.append(connection)
+            self._lock.notify()
+
+    def close_all(self):
+        """Closes every idle connection."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+            self._size -= len(idle)
+            self._lock.notify_all()
+        for connection in idle:
+            self._close_quietly(connection)
+
+    def _release_slot(self):
+        with self._lock:
+            self._size -= 1
+            self._lock.notify()
+
+    def _close_quietly(self, connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_connection_pool():
+    """Returns the process-wide connection pool, creating it on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ConnectionPool()
+        return _pool
+
+def set_connection_pool(pool):
+    """Replaces the process-wide pool (benchmarks point it at a stand-in server)."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close_all()
+        _pool = pool
+
+@contextmanager
+def pooled_connection(pool=None):
+    """Borrows a connection from the shared (or given) pool for the duration of a with block."""
+    import mysql.connector
+    pool = pool or get_connection_pool()
+    connection = pool.acquire()
+    try:
+        yield connection
+    except mysql.connector.Error:
+        pool.release(connection, discard=True)
+        raise
+    except BaseException:
+        pool.release(connection)
+        raise
+    else:
+        pool.release(connection)
+
+def records_page_query(warehouse, client, after=None, limit=RECORDS_PAGE_SIZE):
+    """Returns (query, params) for one page of a client's records, newest first.
+
+    after is the (datetime, id) of the last row of the previous page; the
+    page continues below it, so every page is a short range read on the
+    (warehouse, client, datetime) index. The id is the last column.
+    """
+    condition, params = "", [warehouse, client]
+    if after is not None:
+        condition = "AND (datetime < %s OR (datetime = %s AND id < %s))"
+        params += [after[0], after[0], after[1]]
+    return f"""
+    SELECT client, datetime, activity, duration_ms, duration, id FROM records
+    WHERE warehouse = %s AND client = %s AND deleted = 0 {condition}
+    ORDER BY datetime DESC, id DESC
+    LIMIT {int(limit)}
+    """, tuple(params)
+
+class RecordPager:
+    """Pages through the records of one or more clients, client by client.
+
+    Each page is its own LIMIT query continuing from the last (datetime, id)
+    seen, so no result set or connection is held while the user reads; a
+    pooled connection is borrowed only for the duration of fetch_page.
+    Methods may be called from worker threads.
+    """
+
+    def __init__(self, warehouse, clients, page_size=RECORDS_PAGE_SIZE, pool=None):
+        self.warehouse = warehouse
+        self.clients = list(clients)
+        self.page_size = page_size
+        self.pool = pool or get_connection_pool()
+        self.exhausted = not self.clients
+        self.rows_fetched = 0
+        self._client_index = 0
+        self._after = None
+        self._lock = threading.Lock()
+
+    def fetch_page(self, cancel_event=None):
+        """Returns the next page of (client, datetime, activity, duration_ms, duration) rows."""
+        with self._lock:
+            if self.exhausted:
+                return []
+            if cancel_event is not None and cancel_event.is_set():
+                raise CancelledError("Records view closed")
+            rows = []
+            with pooled_connection(self.pool) as connection:
+                cursor = connection.cursor()
+                try:
+                    while len(rows) < self.page_size and self._client_index < len(self.clients):
+                        limit = self.page_size - len(rows)
+                        query, params = records_page_query(self.warehouse, self.clients[self._client_index],
+                                                           self._after, limit)
+                        with metrics.timer("db_query_ms"):
+                            cursor.execute(query, params)
+                            page = cursor.fetchall()
+                        metrics.inc("db_queries_total")
+                        rows += [row[:-1] for row in page]
+                        if len(page) < limit:
+                            self._client_index += 1  # klient je dočítaný, pokračuje sa ďalším
+                            self._after = None
+                        else:
+                            self._after = (page[-1][1], page[-1][-1])
+                finally:
+                    cursor.close()
+            self.rows_fetched += len(rows)
+            self.exhausted = self._client_index >= len(self.clients)
+            return rows
+
+    def close(self):
+        """Stops paging; no connection is held between pages, so there is nothing to release."""
+        with self._lock:
+            self.exhausted = True
+
+def insert_records_in_chunks(connection, rows, chunk_size=INSERT_CHUNK_SIZE,
+                             retries=INSERT_CHUNK_RETRIES, on_progress=None):
+    """Upserts rows into `records` in chunks, one transaction per chunk.
+
+    Each row is (record_uid, datetime, client, activity, duration, duration_ms,
+    warehouse, deleted); duration is the display string kept for older
+    clients. Rows are keyed by record_uid, so re-sending a chunk after a
+    failure or crash updates the existing rows instead of duplicating them,
+    and deleted=1 turns a row into a tombstone. A chunk that hits a deadlock
+    or lock wait timeout is rolled back and retried on its own; any other
+    error, notably a lost connection, propagates at once so the caller can
+    retry on a fresh pooled connection. Chunks that were already committed
+    stay committed. Returns the number of rows written.
+    """
+    import mysql.connector
+    query = """
+    INSERT INTO records (record_uid, datetime, client, activity, duration, duration_ms, warehouse, deleted)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+        activity = VALUES(activity), duration = VALUES(duration),
+        duration_ms = VALUES(duration_ms), deleted = VALUES(deleted)
+    """
+    total = len(rows)
+    written = 0
+    started = time.perf_counter()
+    cursor = connection.cursor()
+    try:
+        for offset in range(0, total, chunk_size):
+            chunk = rows[offset:offset + chunk_size]
+            attempt = 0
+            while True:
+                try:
+                    # mysql.connector skladá INSERT ... VALUES s executemany do jedného viacriadkového príkazu
+                    with metrics.timer("db_query_ms"):
+                        cursor.executemany(query, chunk)
+                        connection.commit()
+                    metrics.inc("db_queries_total")
+                    break
+                except mysql.connector.Error as error:
+                    if error.errno not in RETRYABLE_ERRNOS or attempt >= retries:
+                        raise
+                    connection.rollback()
+                    attempt += 1
+            written += len(chunk)
+            metrics.inc("db_rows_written_total", len(chunk))
+            if on_progress:
+                elapsed = time.perf_counter() - started
+                rate = written / elapsed if elapsed > 0 else 0.0
+                on_progress(written, total, rate)
+    finally:
+        cursor.close()
+    return written
@@ -0,0 +1,201 @@
+"""Streaming exports of records to Excel, CSV and Parquet.
+
+Rows are written as they arrive, so memory stays bounded by one page of
+rows no matter how much history is exported.
+
+Spustenie bez GUI:
+    python exporter.py --warehouse "Poverax EU" --from 2026-01-01 --to 2026-02-01 out.xlsx
+"""
+import argparse
+import csv
+import os
+import time
+import uuid
+from concurrent.futures import CancelledError
+from datetime import datetime
+from database import pooled_connection
+from record_store import format_duration
+from metrics import metrics
+
+COLUMNS = ["Date and Time", "Client", "Activity", "Duration"]
+DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+COLUMN_WIDTHS = [20, 15, 15, 15]
+FORMATS = ("xlsx", "csv", "parquet")
+HISTORY_PAGE_SIZE = 5000
+PARQUET_ROW_GROUP = 100000
+PROGRESS_EVERY = 50000
+CANCEL_CHECK_EVERY = 1000
+EXCEL_MAX_ROWS = 1048576     # limit riadkov jedného hárku v Exceli
+
+def export_format(path):
+    """Returns the export format implied by the file extension."""
+    extension = os.path.splitext(path)[1].lower().lstrip(".")
+    if extension not in FORMATS:
+        raise ValueError(f"Unsupported export format '{extension}', expected one of {', '.join(FORMATS)}")
+    return extension
+
+def stream_history(warehouse, start, end, page_size=HISTORY_PAGE_SIZE):
+    """Yields export rows for a warehouse from an unbuffered (server-side) cursor.
+
+    The time spent in the database is recorded once in db_query_ms when the
+    stream ends; time the caller spends writing rows is not counted.
+    """
+    with pooled_connection() as connection:
+        cursor = connection.cursor(buffered=False)
+        started = time.perf_counter()
+        cursor.execute("""
+        SELECT datetime, client, activity, duration_ms, duration FROM records
+        WHERE warehouse = %s AND datetime >= %s AND datetime < %s AND deleted = 0
+        ORDER BY datetime
+        """, (warehouse, start, end))
+        query_s = time.perf_counter() - started
+        metrics.inc("db_queries_total")
+        try:
+            while True:
+                started = time.perf_counter()
+                rows = cursor.fetchmany(page_size)
+                query_s += time.perf_counter() - started
+                if not rows:
+                    break
+                for record_datetime, client, activity, duration_ms, duration in rows:
+                    if duration_ms is not None:
+                        duration = format_duration(duration_ms)
+                    yield (str(record_datetime), client, activity, duration_ms, duration)
+        finally:
+            cursor.close()
+            metrics.observe("db_query_ms", query_s * 1000)
+
+def export_rows(rows, path, warehouse, on_progress=None, cancel_event=None):
+    """Writes rows of (datetime, client, activity, duration_ms, duration) to path; returns the row count.
+
+    The file is written under a temporary name and renamed once complete, so
+    a failed or cancelled export never leaves a partial file at path. Once
+    cancel_event is set the export stops with CancelledError.
+    """
+    writer = {"xlsx": write_xlsx, "csv": write_csv, "parquet": write_parquet}[export_format(path)]
+    part_path = f"{path}.{uuid.uuid4().hex[:8]}.part"
+    try:
+        with metrics.timer("export_ms"):
+            written = writer(_rows_until_cancelled(rows, cancel_event), part_path, warehouse, on_progress)
+        os.replace(part_path, path)
+    except BaseException:
+        if os.path.exists(part_path):
+            os.remove(part_path)
+        raise
+    metrics.inc("export_rows_total", written)
+    return written
+
+def _rows_until_cancelled(rows, cancel_event):
+    """Passes rows through, raising CancelledError once cancel_event is set; always closes rows."""
+    try:
+        for index, row in enumerate(rows):
+            if cancel_event is not None and index % CANCEL_CHECK_EVERY == 0 and cancel_event.is_set():
+                raise CancelledError("Export cancelled")
+            yield row
+    finally:
+        close = getattr(rows, "close", None)
+        if close is not None:
+            close()  # stream_history tak hneď vráti spojenie do poolu
+
+def _display_row(row):
+    """The COLUMNS shown in Excel and CSV: duration as M:SS:mmm, without duration_ms."""
+    when, client, activity, _duration_ms, duration = row
+    return (when, client, activity, duration)
+
+def _report(on_progress, written):
+    if on_progress and written % PROGRESS_EVERY == 0:
+        on_progress(written)
+
+def write_xlsx(rows, path, warehouse, on_progress=None):
+    """Writes with xlsxwriter's constant_memory mode, one sheet per Excel row limit."""
+    import xlsxwriter
+    workbook = xlsxwriter.Workbook(path, {"constant_memory": True})
+    title_format = workbook.add_format({"bold": True, "font_size": 14})
+    header_format = workbook.add_format({"bold": True, "border": 1})
+
+    def new_sheet(number):
+        worksheet = workbook.add_worksheet("Records" if number == 1 else f"Records {number}")
+        for column, width in enumerate(COLUMN_WIDTHS):
+            worksheet.set_column(column, column, width)
+        worksheet.write(0, 0, f"Warehouse - {warehouse}", title_format)
+        worksheet.write_row(1, 0, COLUMNS, header_format)
+        return worksheet
+
+    sheets = 1
+    worksheet = new_sheet(sheets)
+    row_number = 2
+    written = 0
+    try:
+        for row in rows:
+            if row_number >= EXCEL_MAX_ROWS:
+                sheets += 1
+                worksheet = new_sheet(sheets)
+                row_number = 2
+            worksheet.write_row(row_number, 0, _display_row(row))
+            row_number += 1
+            written += 1
+            _report(on_progress, written)
+    finally:
+        workbook.close()
+    return written
+
+def write_csv(rows, path, warehouse, on_progress=None):
+    written = 0
+    with open(path, "w", newline="", encoding="utf-8-sig") as file:
+        writer = csv.writer(file)
+        writer.writerow(COLUMNS)
+        for row in rows:
+            writer.writerow(_display_row(row))
+            written += 1
+            _report(on_progress, written)
+    return written
+
+def write_parquet(rows, path, warehouse, on_progress=None):
+    """Writes Parquet row groups of PARQUET_ROW_GROUP rows; the warehouse goes in the file metadata.
+
+    The datetime is a timestamp column and duration_ms an int64 column, so
+    the file can be analysed without parsing the display strings.
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+    schema = pa.schema([("Date and Time", pa.timestamp("s")), ("Client", pa.string()), ("Activity", pa.string()),
+                        ("duration_ms", pa.int64()), ("Duration", pa.string())],
+                       metadata={"warehouse": warehouse})
+    written = 0
+    batch = []
+    with pq.ParquetWriter(path, schema) as writer:
+        def flush():
+            when, client, activity, duration_ms, duration = list(zip(*batch)) if batch else [[] for _ in schema]
+            arrays = [pc.strptime(pa.array(when, pa.string()), format=DATETIME_FORMAT, unit="s"),
+                      pa.array(client, pa.string()), pa.array(activity, pa.string()),
+                      pa.array(duration_ms, pa.int64()), pa.array(duration, pa.string())]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+            batch.clear()
+
+        for row in rows:
+            batch.append(row)
+            written += 1
+            _report(on_progress, written)
+            if len(batch) >= PARQUET_ROW_GROUP:
+                flush()
+        if batch or not written:
+            flush()
+    return written
+
+def parse_date(value):
+    return datetime.strptime(value, "%Y-%m-%d")
+
+def main():
+    parser = argparse.ArgumentParser(description="Export warehouse history to xlsx, csv or parquet.")
+    parser.add_argument("--warehouse", required=True)
+    parser.add_argument("--from", dest="start", type=parse_date, required=True)
+    parser.add_argument("--to", dest="end", type=parse_date, required=True)
+    parser.add_argument("path", help="output file; the extension selects the format")
+    args = parser.parse_args()
+    written = export_rows(stream_history(args.warehouse, args.start, args.end), args.path, args.warehouse,
+                          on_progress=lambda count: print(f"  {count} rows exported"))
+    print(f"Exported {written} rows to '{args.path}'")
+
+if __name__ == "__main__":
+    main()
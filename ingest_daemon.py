@@ -0,0 +1,240 @@
+"""Local ingestion daemon that batches record writes from many stations.
+
+Stations POST their journal batches to /records instead of opening their
+own MySQL connections. The daemon coalesces everything that arrives within
+FLUSH_INTERVAL into large upsert transactions over a small connection
+pool, answers each request only after its rows are committed, and returns
+503 with Retry-After when too many rows are waiting. Malformed rows are
+refused with 400; if the database rejects a merged transaction for its
+data, every request in it is retried on its own, so only the offending one
+gets the error. Connection errors fail the whole batch at once.
+
+Spustenie:
+    python ingest_daemon.py --host 0.0.0.0 --port 8765
+Stanice ho použijú nastavením TIMERAPP_DB_INGEST_URL=http://server:8765
+(alebo "ingest_url" v db_config.json).
+"""
+import argparse
+import json
+import queue
+import threading
+import time
+from datetime import datetime
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from database import pooled_connection, insert_records_in_chunks, is_data_error, RecordsRejected
+from metrics import metrics
+
+DEFAULT_PORT = 8765
+BATCH_ROWS = 5000
+FLUSH_INTERVAL = 0.05        # sekundy, počas ktorých sa zbierajú požiadavky do jednej transakcie
+MAX_PENDING_ROWS = 50000
+WRITERS = 2
+ACK_TIMEOUT = 30             # sekundy, ako dlho daemon drží požiadavku pred potvrdením
+POST_TIMEOUT = ACK_TIMEOUT + 15  # stanica musí čakať dlhšie, inak by posielala dávky, ktoré ešte čakajú v rade
+ROW_LENGTH = 8               # poradie stĺpcov ako v insert_records_in_chunks
+
+def post_records(url, rows, timeout=POST_TIMEOUT):
+    """Sends rows to a daemon and returns once they are committed; raises on failure or backpressure."""
+    body = json.dumps({"rows": [list(row) for row in rows]}).encode("utf-8")
+    request = urllib.request.Request(url.rstrip("/") + "/records", data=body, method="POST",
+                                     headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return json.loads(response.read())
+    except urllib.error.HTTPError as error:
+        detail = error.read().decode("utf-8", "replace")
+        if error.code in (400, 422):
+            raise RecordsRejected(f"Ingest daemon rejected the rows: {detail}") from error
+        raise ConnectionError(f"Ingest daemon returned {error.code}: {detail}") from error
+
+def check_health(url, timeout=5):
+    """Returns the daemon's status dict."""
+    with urllib.request.urlopen(url.rstrip("/") + "/health", timeout=timeout) as response:
+        return json.loads(response.read())
+
+def validate_row(row):
+    """Raises ValueError unless row is a well-typed journal row; returns it as a tuple."""
+    if not isinstance(row, list) or len(row) != ROW_LENGTH:
+        raise ValueError(f"every row needs {ROW_LENGTH} columns")
+    record_uid, when, client, activity, duration, duration_ms, warehouse, deleted = row
+    for name, value in (("record_uid", record_uid), ("datetime", when), ("client", client),
+                        ("activity", activity), ("duration", duration), ("warehouse", warehouse)):
+        if not isinstance(value, str) or not value:
+            raise ValueError(f"{name} must be a non-empty string")
+    datetime.strptime(when, "%Y-%m-%d %H:%M:%S")
+    if not isinstance(duration_ms, int) or isinstance(duration_ms, bool) or duration_ms < 0:
+        raise ValueError("duration_ms must be a non-negative integer")
+    if deleted not in (0, 1) or isinstance(deleted, bool):
+        raise ValueError("deleted must be 0 or 1")
+    return tuple(row)
+
+class _Submission:
+    __slots__ = ("rows", "done", "error")
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.done = threading.Event()
+        self.error = None
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path != "/health":
+            self._reply(404, {"error": "not found"})
+            return
+        self._reply(200, self.server.ingest.status())
+
+    def do_POST(self):
+        if self.path != "/records":
+            self._reply(404, {"error": "not found"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            rows = [validate_row(row) for row in json.loads(self.rfile.read(length))["rows"]]
+        except (ValueError, KeyError, TypeError) as error:
+            self._reply(400, {"error": str(error)})
+            return
+        status, payload = self.server.ingest.submit(rows)
+        self._reply(status, payload, retry_after=status == 503)
+
+    def _reply(self, status, payload, retry_after=False):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if retry_after:
+            self.send_header("Retry-After", "1")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # každá požiadavka by inak zapisovala na stderr
+
+class IngestServer:
+    """HTTP front end plus writer threads that coalesce submissions into transactions."""
+
+    def __init__(self, host="127.0.0.1", port=DEFAULT_PORT, batch_rows=BATCH_ROWS, flush_interval=FLUSH_INTERVAL,
+                 max_pending_rows=MAX_PENDING_ROWS, writers=WRITERS, ack_timeout=ACK_TIMEOUT):
+        self.batch_rows = batch_rows
+        self.flush_interval = flush_interval
+        self.max_pending_rows = max_pending_rows
+        self.ack_timeout = ack_timeout
+        self.stats = {"requests": 0, "rejected": 0, "batches": 0, "rows": 0, "errors": 0, "pending_rows": 0}
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self.httpd = ThreadingHTTPServer((host, port), _Handler)
+        self.httpd.daemon_threads = True
+        self.httpd.ingest = self
+        self._threads = [threading.Thread(target=self.httpd.serve_forever, name="ingest-http", daemon=True)]
+        self._threads += [threading.Thread(target=self._write_loop, name=f"ingest-writer-{n}", daemon=True)
+                          for n in range(writers)]
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        for thread in self._threads:
+            thread.join(5)
+
+    def status(self):
+        with self._lock:
+            return dict(self.stats)
+
+    def submit(self, rows):
+        """Queues rows and waits for their commit; returns (HTTP status, payload)."""
+        with self._lock:
+            self.stats["requests"] += 1
+            if self.stats["pending_rows"] + len(rows) > self.max_pending_rows:
+                self.stats["rejected"] += 1
+                return 503, {"error": "too many pending rows, retry later"}
+            self.stats["pending_rows"] += len(rows)
+        submission = _Submission(rows)
+        self._queue.put(submission)
+        if not submission.done.wait(self.ack_timeout):
+            return 504, {"error": "rows not committed in time; retrying is safe"}
+        if submission.error is not None:
+            # 422: MySQL odmietol samotné dáta, opakovanie nepomôže; 500: chyba spojenia
+            return 422 if is_data_error(submission.error) else 500, {"error": str(submission.error)}
+        return 200, {"accepted": len(rows)}
+
+    def _write_loop(self):
+        while not self._stop.is_set():
+            try:
+                batch = [self._queue.get(timeout=0.5)]
+            except queue.Empty:
+                continue
+            row_count = len(batch[0].rows)
+            deadline = time.monotonic() + self.flush_interval
+            while row_count < self.batch_rows:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    submission = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                batch.append(submission)
+                row_count += len(submission.rows)
+
+            error = self._write([row for s in batch for row in s.rows])
+            if error is None:
+                errors = [None] * len(batch)
+            elif len(batch) > 1 and is_data_error(error):
+                # Jedna zlá stanica nesmie zhodiť zápis ostatných: každá požiadavka zvlášť
+                errors = [self._write(submission.rows) for submission in batch]
+            else:
+                errors = [error] * len(batch)  # pri výpadku DB by opakovanie po jednom len čakalo na timeouty
+            with self._lock:
+                self.stats["pending_rows"] -= row_count
+                for submission, error in zip(batch, errors):
+                    if error is None:
+                        self.stats["rows"] += len(submission.rows)
+                    else:
+                        self.stats["errors"] += 1
+                self.stats["batches"] += 1
+            metrics.inc("ingest_batches_total")
+            for submission, error in zip(batch, errors):
+                submission.error = error
+                submission.done.set()
+
+    def _write(self, rows):
+        """Upserts rows in one transaction; returns the exception instead of raising it."""
+        try:
+            with pooled_connection() as connection:
+                insert_records_in_chunks(connection, rows, chunk_size=max(len(rows), 1))
+        except Exception as error:
+            return error
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch record writes from many TimerApp stations.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--batch-rows", type=int, default=BATCH_ROWS)
+    parser.add_argument("--max-pending-rows", type=int, default=MAX_PENDING_ROWS)
+    parser.add_argument("--writers", type=int, default=WRITERS)
+    args = parser.parse_args()
+    server = IngestServer(args.host, args.port, batch_rows=args.batch_rows,
+                          max_pending_rows=args.max_pending_rows, writers=args.writers).start()
+    print(f"Ingest daemon listening on {server.url}")
+    try:
+        while True:
+            time.sleep(60)
+            print(f"Status: {server.status()}")
+    except KeyboardInterrupt:
+        server.stop()
+
+if __name__ == "__main__":
+    main()
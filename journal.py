@@ -0,0 +1,224 @@
+import os
+import sqlite3
+import threading
+import time
+from database import pooled_connection, insert_records_in_chunks, is_data_error
+
+JOURNAL_PATH = os.environ.get(
+    "TIMERAPP_JOURNAL", os.path.join(os.path.dirname(os.path.abspath(__file__)), "journal.db"))
+SYNC_BATCH_SIZE = 5000       # jedna dávka synchronizácie = viac INSERT_CHUNK_SIZE transakcií
+SYNC_IDLE_INTERVAL = 5       # sekundy medzi kontrolami, keď je žurnál prázdny
+SYNC_MAX_BACKOFF = 60
+
+class RecordJournal:
+    """Durable local journal of stopped timers, kept until they reach MySQL.
+
+    Every append is committed with synchronous=FULL, so a record survives a
+    crash or power cut the moment stop_timer returns. The sync offset is
+    stored in the same file, so a restarted app resumes where it stopped.
+    """
+
+    def __init__(self, path=JOURNAL_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=FULL")
+        self._db.executescript("""
+        CREATE TABLE IF NOT EXISTS journal (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            record_uid TEXT,
+            datetime TEXT NOT NULL,
+            client TEXT NOT NULL,
+            activity TEXT NOT NULL,
+            duration TEXT NOT NULL,
+            duration_ms INTEGER NOT NULL,
+            warehouse TEXT NOT NULL,
+            deleted INTEGER NOT NULL DEFAULT 0
+        );
+        CREATE TABLE IF NOT EXISTS dead_letter (
+            seq INTEGER PRIMARY KEY,
+            record_uid TEXT,
+            datetime TEXT NOT NULL,
+            client TEXT NOT NULL,
+            activity TEXT NOT NULL,
+            duration TEXT NOT NULL,
+            duration_ms INTEGER NOT NULL,
+            warehouse TEXT NOT NULL,
+            deleted INTEGER NOT NULL DEFAULT 0,
+            error TEXT NOT NULL,
+            rejected_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+        );
+        CREATE TABLE IF NOT EXISTS sync_state (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            synced_seq INTEGER NOT NULL
+        );
+        INSERT OR IGNORE INTO sync_state (id, synced_seq) VALUES (1, 0);
+        """)
+        # Žurnály zo staršej verzie nemajú stĺpce record_uid a deleted
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(journal)")}
+        if "record_uid" not in columns:
+            self._db.execute("ALTER TABLE journal ADD COLUMN record_uid TEXT")
+        if "deleted" not in columns:
+            self._db.execute("ALTER TABLE journal ADD COLUMN deleted INTEGER NOT NULL DEFAULT 0")
+        self._db.commit()
+
+    def append(self, row):
+        """Appends a row in insert_records_in_chunks order and returns its seq.
+
+        A record and its later tombstone are separate entries with the same
+        uid; they reach MySQL in append order.
+        """
+        return self.append_many([row])
+
+    def append_many(self, rows):
+        """Appends rows in one transaction (a single fsync) and returns the last seq."""
+        with self._lock:
+            seq = None
+            for row in rows:
+                seq = self._db.execute(
+                    "INSERT INTO journal (record_uid, datetime, client, activity, duration, duration_ms,"
+                    " warehouse, deleted) VALUES (?, ?, ?, ?, ?, ?, ?, ?)", row).lastrowid
+            self._db.commit()
+            return seq
+
+    def pending(self, limit):
+        """Returns up to limit unsynced (seq, row) pairs in append order."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT seq, record_uid, datetime, client, activity, duration, duration_ms, warehouse, deleted"
+                " FROM journal"
+                " WHERE seq > (SELECT synced_seq FROM sync_state WHERE id = 1) ORDER BY seq LIMIT ?",
+                (limit,)).fetchall()
+        return [(row[0], row[1:]) for row in rows]
+
+    def depth(self):
+        with self._lock:
+            return self._db.execute(
+                "SELECT COUNT(*) FROM journal"
+                " WHERE seq > (SELECT synced_seq FROM sync_state WHERE id = 1)").fetchone()[0]
+
+    def mark_synced(self, seq, rejected=()):
+        """Advances the sync offset and drops entries that are now in MySQL.
+
+        rejected holds (seq, row, error) for entries MySQL refused; they are
+        moved to the dead_letter table in the same transaction.
+        """
+        with self._lock:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO dead_letter (seq, record_uid, datetime, client, activity, duration,"
+                " duration_ms, warehouse, deleted, error) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(entry_seq, *row, str(error)) for entry_seq, row, error in rejected])
+            self._db.execute("UPDATE sync_state SET synced_seq = ? WHERE id = 1", (seq,))
+            self._db.execute("DELETE FROM journal WHERE seq <= ?", (seq,))
+            self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+def write_to_database(rows, on_progress=None):
+    """Default sink: upserts rows straight into MySQL over a pooled connection, chunk by chunk."""
+    with pooled_connection() as connection:
+        insert_records_in_chunks(connection, rows, on_progress=on_progress)
+
+class JournalSyncer:
+    """Background thread that drains the journal into MySQL in batches.
+
+    Connection failures back off exponentially up to SYNC_MAX_BACKOFF seconds
+    and retry the same batch. Rows MySQL rejects for their data are moved to
+    the journal's dead_letter table instead, so they cannot block the rows
+    queued after them. on_status is called from the syncer thread with a
+    stats dict after every attempt.
+    sink(rows, on_progress) does the actual write: MySQL directly by default,
+    or an ingest daemon in daemon mode. on_progress(written, total, rate) is
+    called from the syncer thread after every committed chunk.
+    """
+
+    def __init__(self, journal, batch_size=SYNC_BATCH_SIZE, on_status=None, sink=write_to_database,
+                 on_progress=None):
+        self.journal = journal
+        self.batch_size = batch_size
+        self.on_status = on_status
+        self.on_progress = on_progress
+        self.sink = sink
+        self.stats = {"synced": 0, "depth": journal.depth(), "rate": 0.0, "error": None, "uids": [],
+                      "rejected": []}
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="timerapp-journal-sync", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def sync_now(self):
+        """Wakes the syncer, cutting any backoff short."""
+        self._wake.set()
+
+    def stop(self, timeout=5):
+        self._stop.set()
+        self._wake.set()
+        if self._thread.is_alive():  # okno sa dá zavrieť skôr, než deferred_startup syncer spustí
+            self._thread.join(timeout)
+
+    def _run(self):
+        backoff = 1
+        while not self._stop.is_set():
+            try:
+                synced = self.sync_batch()
+                self.stats["error"] = None
+                backoff = 1
+            except Exception as error:
+                synced = 0
+                self.stats["error"] = str(error)
+                self.stats["uids"] = []
+                self.stats["rejected"] = []
+            self.stats["depth"] = self.journal.depth()
+            if self.on_status:
+                self.on_status(dict(self.stats, batch=synced))
+            if synced and self.stats["depth"]:
+                continue
+            if self.stats["error"]:
+                wait, backoff = backoff, min(backoff * 2, SYNC_MAX_BACKOFF)
+            else:
+                wait = SYNC_IDLE_INTERVAL
+            self._wake.wait(wait)
+            self._wake.clear()
+
+    def sync_batch(self):
+        """Sends one batch to MySQL and advances the offset; returns rows synced."""
+        batch = self.journal.pending(self.batch_size)
+        if not batch:
+            return 0
+        started = time.perf_counter()
+        rejected = []
+        try:
+            self.sink([row for _seq, row in batch], on_progress=self.on_progress)
+        except Exception as error:
+            if not is_data_error(error):
+                raise
+            rejected = self.send_individually(batch)
+        self.journal.mark_synced(batch[-1][0], rejected)
+        elapsed = time.perf_counter() - started
+        rejected_seqs = {seq for seq, _row, _error in rejected}
+        self.stats["synced"] += len(batch) - len(rejected)
+        self.stats["uids"] = [row[0] for seq, row in batch if row[0] and not row[-1] and seq not in rejected_seqs]
+        self.stats["rejected"] = [(row, str(error)) for _seq, row, error in rejected]
+        self.stats["rate"] = len(batch) / elapsed if elapsed > 0 else 0.0
+        return len(batch)
+
+    def send_individually(self, batch):
+        """Resends a rejected batch row by row; returns (seq, row, error) for the rows refused again.
+
+        A connection error still propagates, and the whole batch is retried
+        later; rows already sent are upserts, so resending them is harmless.
+        """
+        rejected = []
+        for seq, row in batch:
+            try:
+                self.sink([row])
+            except Exception as error:
+                if not is_data_error(error):
+                    raise
+                rejected.append((seq, row, error))
+        return rejected
@@ -1,9 +1,14 @@
+from update_checker import check_for_update, recover_interrupted_update
+
+# Prerušenú aktualizáciu treba dokončiť skôr, než sa načítajú ostatné moduly programu
+RECOVERED_UPDATE = recover_interrupted_update()
+
 import tkinter as tk
 from warehouse_selector_module import WarehouseSelector
 from timer_app import TimerApp
-from update_checker import check_for_update
 
 CURRENT_VERSION = "v1.0.0"  # Aktuálna verzia programu
+UPDATE_CHECK_DELAY = 1000   # ms po zobrazení okna, kým sa skontroluje aktualizácia
 
 def main():
     root = tk.Tk()
@@ -14,11 +19,14 @@ def main():
     if selected_warehouse:
         root = tk.Tk()
         app = TimerApp(root, selected_warehouse)
+        if RECOVERED_UPDATE:
+            app.update_console(f"An interrupted update was {RECOVERED_UPDATE}.", color="white")
 
-        # Skontrolujte aktualizáciu pri spustení
-        latest_version = check_for_update(CURRENT_VERSION)
-        if latest_version:
-            app.prompt_update(latest_version)
+        # Skontrolujte aktualizáciu až po zobrazení okna a na pozadí
+        root.after(UPDATE_CHECK_DELAY, lambda: app.tasks.submit(
+            check_for_update, CURRENT_VERSION,
+            on_done=lambda latest_version: latest_version and app.prompt_update(latest_version),
+            timeout=8, key="update-check"))
 
         root.mainloop()
 
@@ -0,0 +1,148 @@
+"""In-process counters and latency histograms for the hot paths.
+
+Everything goes through the module-level `metrics` registry. With
+TIMERAPP_METRICS=0 every call returns after a single attribute check and
+timer() hands back a shared no-op context manager.
+"""
+import json
+import os
+import threading
+import time
+
+METRICS_DIR = os.environ.get("TIMERAPP_METRICS_DIR", os.path.dirname(os.path.abspath(__file__)))
+EXPORT_INTERVAL = 15000      # ms medzi zápismi textfile/JSON súborov
+BUCKETS_MS = (0.5, 1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, float("inf"))
+
+class Histogram:
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS_MS)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for index, bound in enumerate(BUCKETS_MS):
+            if value <= bound:
+                self.counts[index] += 1
+                break
+        self.total += value
+        self.count += 1
+
+    def percentile(self, p):
+        """Upper bound of the bucket holding the p-th percentile (largest finite bound on overflow)."""
+        if not self.count:
+            return 0.0
+        target = self.count * p / 100
+        seen = 0
+        for bound, bucket_count in zip(BUCKETS_MS, self.counts):
+            seen += bucket_count
+            if seen >= target:
+                break
+        return bound if bound != float("inf") else BUCKETS_MS[-2]
+
+class _NoopTimer:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NOOP_TIMER = _NoopTimer()
+
+class _Timer:
+    __slots__ = ("registry", "name", "started")
+
+    def __init__(self, registry, name):
+        self.registry = registry
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.registry.observe(self.name, (time.perf_counter() - self.started) * 1000)
+        return False
+
+class Metrics:
+    """Thread-safe registry of counters, gauges and millisecond histograms."""
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.counters = {}
+        self.gauges = {}
+        self.histograms = {}
+        self._lock = threading.Lock()
+
+    def inc(self, name, value=1):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def set_gauge(self, name, value):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.gauges[name] = value
+
+    def observe(self, name, milliseconds):
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.observe(milliseconds)
+
+    def timer(self, name):
+        """Context manager recording the duration of its block in histogram `name`."""
+        if not self.enabled:
+            return _NOOP_TIMER
+        return _Timer(self, name)
+
+    def snapshot(self):
+        """Returns a JSON-serialisable copy of all metrics."""
+        with self._lock:
+            return {
+                "counters": dict(self.counters),
+                "gauges": dict(self.gauges),
+                "histograms": {
+                    name: {"count": h.count, "sum_ms": h.total,
+                           "p50_ms": h.percentile(50), "p90_ms": h.percentile(90), "p99_ms": h.percentile(99),
+                           "buckets": dict(zip((str(b) for b in BUCKETS_MS), h.counts))}
+                    for name, h in self.histograms.items()
+                },
+            }
+
+    def prometheus_text(self, prefix="timerapp_"):
+        """Formats the metrics in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            for name, value in sorted(self.counters.items()):
+                lines += [f"# TYPE {prefix}{name} counter", f"{prefix}{name} {value}"]
+            for name, value in sorted(self.gauges.items()):
+                lines += [f"# TYPE {prefix}{name} gauge", f"{prefix}{name} {value}"]
+            for name, histogram in sorted(self.histograms.items()):
+                lines.append(f"# TYPE {prefix}{name} histogram")
+                cumulative = 0
+                for bound, bucket_count in zip(BUCKETS_MS, histogram.counts):
+                    cumulative += bucket_count
+                    le = "+Inf" if bound == float("inf") else bound
+                    lines.append(f'{prefix}{name}_bucket{{le="{le}"}} {cumulative}')
+                lines += [f"{prefix}{name}_sum {histogram.total}", f"{prefix}{name}_count {histogram.count}"]
+        return "\n".join(lines) + "\n"
+
+    def write_files(self, directory=METRICS_DIR):
+        """Atomically writes timerapp.prom and timerapp_metrics.json for the node exporter."""
+        if not self.enabled:
+            return
+        for filename, content in (("timerapp.prom", self.prometheus_text()),
+                                  ("timerapp_metrics.json", json.dumps(self.snapshot(), indent=2))):
+            path = os.path.join(directory, filename)
+            with open(path + ".tmp", "w", encoding="utf-8") as file:
+                file.write(content)
+            os.replace(path + ".tmp", path)
+
+metrics = Metrics(enabled=os.environ.get("TIMERAPP_METRICS", "1") != "0")
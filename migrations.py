@@ -0,0 +1,157 @@
+"""Versioned schema migrations for the records table.
+
+Spustenie: python migrations.py            (aplikuje chýbajúce migrácie)
+           python migrations.py --status   (vypíše aktuálnu verziu schémy)
+"""
+import argparse
+import time
+from database import get_database_connection
+
+BACKFILL_BATCH_SIZE = 5000
+
+# Trvanie je uložené ako "M:SS:mmm" (TimerApp.format_time)
+DURATION_PATTERN = "^[0-9]+:[0-9]{2}:[0-9]{3}$"
+DURATION_TO_MS = (
+    "CAST(SUBSTRING_INDEX(duration, ':', 1) AS UNSIGNED) * 60000"
+    " + CAST(SUBSTRING_INDEX(SUBSTRING_INDEX(duration, ':', 2), ':', -1) AS UNSIGNED) * 1000"
+    " + CAST(SUBSTRING_INDEX(duration, ':', -1) AS UNSIGNED)"
+)
+
+def column_exists(cursor, table, column):
+    cursor.execute(
+        "SELECT COUNT(*) FROM information_schema.columns"
+        " WHERE table_schema = DATABASE() AND table_name = %s AND column_name = %s",
+        (table, column))
+    return cursor.fetchone()[0] > 0
+
+def index_exists(cursor, table, index):
+    cursor.execute(
+        "SELECT COUNT(*) FROM information_schema.statistics"
+        " WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s",
+        (table, index))
+    return cursor.fetchone()[0] > 0
+
+def add_duration_ms(connection, log):
+    cursor = connection.cursor()
+    if not column_exists(cursor, "records", "duration_ms"):
+        cursor.execute("ALTER TABLE records ADD COLUMN duration_ms BIGINT NULL AFTER duration")
+    cursor.close()
+
+def backfill_duration_ms(connection, log):
+    """Fills duration_ms from the display strings, one committed primary-key range at a time.
+
+    Each batch reads only the ids (last_id, last_id + BACKFILL_BATCH_SIZE],
+    so the total cost stays linear in the table size.
+    """
+    cursor = connection.cursor()
+    query = f"""
+    UPDATE records SET duration_ms = {DURATION_TO_MS}
+    WHERE id > %s AND id <= %s AND duration_ms IS NULL AND duration REGEXP %s
+    """
+    cursor.execute("SELECT MIN(id), MAX(id) FROM records")
+    first_id, max_id = cursor.fetchone()
+    total = 0
+    started = time.perf_counter()
+    last_id = (first_id or 0) - 1
+    while max_id is not None and last_id < max_id:
+        next_id = last_id + BACKFILL_BATCH_SIZE
+        cursor.execute(query, (last_id, next_id, DURATION_PATTERN))
+        connection.commit()
+        last_id = next_id
+        if cursor.rowcount > 0:
+            total += cursor.rowcount
+            log(f"  backfilled {total} rows up to id {last_id}"
+                f" ({total / (time.perf_counter() - started):.0f} rows/s)")
+    cursor.execute("SELECT COUNT(*) FROM records WHERE duration_ms IS NULL")
+    skipped = cursor.fetchone()[0]
+    if skipped:
+        log(f"  {skipped} rows have an unparseable duration and were left NULL")
+    cursor.close()
+
+def add_records_index(connection, log):
+    cursor = connection.cursor()
+    if not index_exists(cursor, "records", "idx_records_warehouse_client_datetime"):
+        cursor.execute("CREATE INDEX idx_records_warehouse_client_datetime"
+                       " ON records (warehouse, client, datetime)")
+    cursor.close()
+
+def add_record_uid(connection, log):
+    """Adds the station-generated record key and the tombstone flag."""
+    cursor = connection.cursor()
+    if not column_exists(cursor, "records", "record_uid"):
+        cursor.execute("ALTER TABLE records ADD COLUMN record_uid CHAR(32) NULL FIRST")
+    if not column_exists(cursor, "records", "deleted"):
+        cursor.execute("ALTER TABLE records ADD COLUMN deleted TINYINT(1) NOT NULL DEFAULT 0")
+    if not index_exists(cursor, "records", "uq_records_record_uid"):
+        cursor.execute("CREATE UNIQUE INDEX uq_records_record_uid ON records (record_uid)")
+    cursor.close()
+
+def add_warehouse_datetime_index(connection, log):
+    """Serves date-range exports and reports, which filter by warehouse and datetime without a client."""
+    cursor = connection.cursor()
+    if not index_exists(cursor, "records", "idx_records_warehouse_datetime"):
+        cursor.execute("CREATE INDEX idx_records_warehouse_datetime ON records (warehouse, datetime)")
+    cursor.close()
+
+# (verzia, popis, funkcia) - nové migrácie pridávajte iba na koniec
+MIGRATIONS = [
+    (1, "add records.duration_ms", add_duration_ms),
+    (2, "backfill records.duration_ms", backfill_duration_ms),
+    (3, "index records (warehouse, client, datetime)", add_records_index),
+    (4, "add records.record_uid and records.deleted", add_record_uid),
+    (5, "index records (warehouse, datetime)", add_warehouse_datetime_index),
+]
+
+def ensure_version_table(connection):
+    cursor = connection.cursor()
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS schema_migrations (
+        version INT PRIMARY KEY,
+        description VARCHAR(255) NOT NULL,
+        applied_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+    )
+    """)
+    connection.commit()
+    cursor.close()
+
+def current_version(connection):
+    ensure_version_table(connection)
+    cursor = connection.cursor()
+    cursor.execute("SELECT COALESCE(MAX(version), 0) FROM schema_migrations")
+    version = cursor.fetchone()[0]
+    cursor.close()
+    return version
+
+def run_migrations(connection, log=print):
+    """Applies every migration newer than the recorded schema version."""
+    version = current_version(connection)
+    applied = 0
+    for number, description, migrate in MIGRATIONS:
+        if number <= version:
+            continue
+        log(f"Applying migration {number}: {description}")
+        migrate(connection, log)
+        cursor = connection.cursor()
+        cursor.execute("INSERT INTO schema_migrations (version, description) VALUES (%s, %s)",
+                       (number, description))
+        connection.commit()
+        cursor.close()
+        applied += 1
+    log(f"Schema is at version {current_version(connection)} ({applied} migrations applied)")
+    return applied
+
+def main():
+    parser = argparse.ArgumentParser(description="Migrate the TimerApp records schema.")
+    parser.add_argument("--status", action="store_true", help="print the schema version and exit")
+    args = parser.parse_args()
+    connection = get_database_connection()
+    try:
+        if args.status:
+            print(f"Schema version {current_version(connection)} of {MIGRATIONS[-1][0]}")
+        else:
+            run_migrations(connection)
+    finally:
+        connection.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+import math
+from record_store import format_duration
+from stopwatch import Stopwatch, TickLoop
+from metrics import metrics
+
+class TimerSlot:
+    """One timer of the board: its own stopwatch, client, activity and label."""
+    __slots__ = ("client", "activity", "stopwatch", "label", "displayed")
+
+    def __init__(self, client, activity, label=None):
+        self.client = client
+        self.activity = activity
+        self.stopwatch = Stopwatch()
+        self.label = label
+        self.displayed = None
+
+    @property
+    def running(self):
+        return self.stopwatch.running
+
+class TimerBoard:
+    """Many independent timers driven by a single shared TickLoop.
+
+    The loop only runs while at least one timer is running, and a tick
+    repaints only running timers inside the visible row range (set from the
+    scroll position with set_visible), so its cost depends on what is on
+    screen, not on how many timers exist. Labels are reconfigured only when
+    their text changes.
+    """
+
+    VISIBLE_MARGIN = 1           # riadky nad a pod viditeľnou oblasťou, ktoré sa tiež prekresľujú
+
+    def __init__(self, root, min_interval=33, max_interval=100):
+        self.slots = []
+        self.running_count = 0
+        self.visible = (0, 0)
+        self.tick_loop = TickLoop(root, self.repaint, min_interval=min_interval, max_interval=max_interval)
+
+    def __len__(self):
+        return len(self.slots)
+
+    def __iter__(self):
+        return iter(self.slots)
+
+    def add(self, client, activity, label=None):
+        """Appends a stopped timer and returns it."""
+        slot = TimerSlot(client, activity, label)
+        self.slots.append(slot)
+        return slot
+
+    def remove(self, slot):
+        if slot.running:
+            self.stop(slot)
+        self.slots.remove(slot)
+
+    def start(self, slot):
+        if slot.running:
+            return
+        slot.stopwatch.start()
+        self.running_count += 1
+        metrics.set_gauge("timers_running", self.running_count)
+        if not self.tick_loop.running:
+            self.tick_loop.start()
+
+    def stop(self, slot):
+        """Stops a timer, paints its final time and returns the elapsed milliseconds."""
+        if slot.running:
+            self.running_count -= 1
+            metrics.set_gauge("timers_running", self.running_count)
+            if not self.running_count:
+                self.tick_loop.stop()
+        duration_ms = slot.stopwatch.stop() // 1_000_000
+        self.paint(slot)
+        return duration_ms
+
+    def stop_all(self):
+        """Stops every running timer; returns (slot, milliseconds) pairs in board order."""
+        return [(slot, self.stop(slot)) for slot in self.slots if slot.running]
+
+    def set_visible(self, first, last):
+        """Sets the visible rows from scrollbar fractions (as passed to yscrollcommand)."""
+        count = len(self.slots)
+        self.visible = (max(0, math.floor(float(first) * count) - self.VISIBLE_MARGIN),
+                        min(count, math.ceil(float(last) * count) + self.VISIBLE_MARGIN))
+
+    def repaint(self):
+        """Tick callback: repaints running timers in the visible range."""
+        for slot in self.slots[self.visible[0]:self.visible[1]]:
+            if slot.running:
+                self.paint(slot)
+
+    def paint(self, slot):
+        formatted_time = format_duration(slot.stopwatch.elapsed_ms())
+        if formatted_time != slot.displayed and slot.label is not None:
+            slot.displayed = formatted_time
+            slot.label.config(text=formatted_time)
@@ -0,0 +1,87 @@
+import uuid
+from datetime import datetime
+
+def format_duration(milliseconds):
+    """Formats milliseconds as M:SS:mmm, the format shown in the UI."""
+    total_seconds, milliseconds = divmod(milliseconds, 1000)
+    minutes, seconds = divmod(total_seconds, 60)
+    return f"{minutes}:{seconds:02}:{milliseconds:03}"
+
+class Record:
+    """One stopped timer. Client and activity are ids into the store's name tables.
+
+    uid is generated on the station and is the record's key in MySQL, so
+    re-sending a record updates it instead of inserting a duplicate.
+    """
+    __slots__ = ("uid", "timestamp", "client_id", "activity_id", "duration_ms", "synced")
+
+    def __init__(self, timestamp, client_id, activity_id, duration_ms, uid=None):
+        self.uid = uid or uuid.uuid4().hex
+        self.timestamp = timestamp
+        self.client_id = client_id
+        self.activity_id = activity_id
+        self.duration_ms = duration_ms
+        self.synced = False
+
+class RecordStore:
+    """Session records in stop order; the records listbox is only a view of it."""
+
+    def __init__(self):
+        self.records = []
+        self.client_names = []
+        self.activity_names = []
+        self._client_ids = {}
+        self._activity_ids = {}
+
+    def __len__(self):
+        return len(self.records)
+
+    def __iter__(self):
+        return iter(self.records)
+
+    def __getitem__(self, index):
+        return self.records[index]
+
+    def _intern(self, name, names, ids):
+        name_id = ids.get(name)
+        if name_id is None:
+            name_id = ids[name] = len(names)
+            names.append(name)
+        return name_id
+
+    def add(self, client, activity, duration_ms, timestamp=None):
+        """Appends a record and returns it."""
+        record = Record(
+            timestamp if timestamp is not None else datetime.now().timestamp(),
+            self._intern(client, self.client_names, self._client_ids),
+            self._intern(activity, self.activity_names, self._activity_ids),
+            int(duration_ms),
+        )
+        self.records.append(record)
+        return record
+
+    def remove(self, index):
+        return self.records.pop(index)
+
+    def mark_synced(self, uids):
+        """Flags records with the given uids as stored in MySQL; returns their indices."""
+        uids = set(uids)
+        indices = []
+        for index, record in enumerate(self.records):
+            if record.uid in uids:
+                record.synced = True
+                indices.append(index)
+        return indices
+
+    def rows(self, records=None):
+        """Yields (datetime string, client, activity, duration_ms) tuples."""
+        for record in self.records if records is None else records:
+            yield (datetime.fromtimestamp(record.timestamp).strftime("%Y-%m-%d %H:%M:%S"),
+                   self.client_names[record.client_id],
+                   self.activity_names[record.activity_id],
+                   record.duration_ms)
+
+    def display_text(self, record):
+        """Returns the listbox line for a record."""
+        when, client, activity, duration_ms = next(self.rows((record,)))
+        return f"{when} - {client} - {activity}: {format_duration(duration_ms)}"
@@ -0,0 +1,148 @@
+"""Productivity reports per warehouse: totals, counts, means and percentiles.
+
+Spustenie bez GUI:
+    python reports.py --warehouse "Poverax EU" --from 2026-01-01 --to 2026-02-01 --period week
+"""
+import argparse
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from database import pooled_connection
+from metrics import metrics
+
+PERIODS = ("day", "week", "shift")
+PERCENTILES = (50, 90, 99)
+FETCH_PAGE_SIZE = 10000
+REPORT_CACHE_SIZE = 32        # najstaršie nepoužité reporty sa z cache vyhadzujú
+
+# Zmeny: ranná 6-14, poobedná 14-22, nočná 22-6 (nočná patrí k dňu, v ktorom začala)
+PERIOD_SQL = {
+    "day": "CAST(DATE(datetime) AS CHAR)",
+    "week": "CAST(YEARWEEK(datetime, 3) AS CHAR)",
+    "shift": """CASE
+        WHEN HOUR(datetime) < 6 THEN CONCAT(DATE(datetime - INTERVAL 1 DAY), ' night')
+        WHEN HOUR(datetime) < 14 THEN CONCAT(DATE(datetime), ' morning')
+        WHEN HOUR(datetime) < 22 THEN CONCAT(DATE(datetime), ' afternoon')
+        ELSE CONCAT(DATE(datetime), ' night') END""",
+}
+KEY_COLUMNS = ["period", "client", "activity"]
+REPORT_COLUMNS = KEY_COLUMNS + ["count", "total_ms", "mean_ms"] + [f"p{p}_ms" for p in PERCENTILES]
+
+class ReportEngine:
+    """Builds aggregated reports and caches them per (warehouse, range, period).
+
+    Counts, totals and means are grouped in MySQL; percentiles are computed
+    with pandas over the duration_ms column, which MySQL cannot do directly.
+    The cache keeps the cache_size most recently used reports. invalidate
+    bumps a per-warehouse generation, so a report whose query was already
+    running when new records were synced is returned but not cached.
+    """
+
+    def __init__(self, connection_factory=pooled_connection, cache_size=REPORT_CACHE_SIZE):
+        self.connection_factory = connection_factory
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._generations = {}
+        self._lock = threading.Lock()
+
+    def build(self, warehouse, start, end, period="day"):
+        """Returns a DataFrame with one row per (period, client, activity) in [start, end)."""
+        if period not in PERIODS:
+            raise ValueError(f"Unknown period '{period}', expected one of {', '.join(PERIODS)}")
+        key = (warehouse, start, end, period)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+            generation = self._generations.setdefault(warehouse, 0)
+
+        where = ("WHERE warehouse = %s AND datetime >= %s AND datetime < %s"
+                 " AND duration_ms IS NOT NULL AND deleted = 0")
+        params = (warehouse, start, end)
+        bucket = PERIOD_SQL[period]
+        with self.connection_factory() as connection:
+            totals = self._query_frame(connection, f"""
+                SELECT {bucket} AS period, client, activity,
+                       COUNT(*) AS count, SUM(duration_ms) AS total_ms, AVG(duration_ms) AS mean_ms
+                FROM records {where}
+                GROUP BY period, client, activity
+                """, params, KEY_COLUMNS + ["count", "total_ms", "mean_ms"])
+            durations = self._query_frame(connection, f"""
+                SELECT {bucket} AS period, client, activity, duration_ms
+                FROM records {where}
+                """, params, KEY_COLUMNS + ["duration_ms"])
+
+        report = totals.merge(self.percentiles(durations), on=KEY_COLUMNS, how="left")
+        report = report.sort_values(KEY_COLUMNS).reset_index(drop=True)[REPORT_COLUMNS]
+        with self._lock:
+            # Počas dotazu mohli pribudnúť záznamy, taký report by bol v cache zastaraný
+            if self._generations[warehouse] == generation:
+                self._cache[key] = report
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return report
+
+    def percentiles(self, durations):
+        """Computes duration percentiles per (period, client, activity) group."""
+        import numpy as np
+        import pandas as pd
+        columns = KEY_COLUMNS + [f"p{p}_ms" for p in PERCENTILES]
+        if durations.empty:
+            return pd.DataFrame(columns=columns)
+        grouped = durations.groupby(KEY_COLUMNS)["duration_ms"]
+        quantiles = grouped.quantile(np.array(PERCENTILES) / 100).unstack()
+        quantiles.columns = [f"p{p}_ms" for p in PERCENTILES]
+        return quantiles.reset_index()[columns]
+
+    def invalidate(self, warehouse=None):
+        """Drops cached reports for a warehouse (all warehouses if None)."""
+        with self._lock:
+            for name in list(self._generations) if warehouse is None else [warehouse]:
+                self._generations[name] = self._generations.get(name, 0) + 1
+            for key in [k for k in self._cache if warehouse is None or k[0] == warehouse]:
+                del self._cache[key]
+
+    def _query_frame(self, connection, query, params, columns):
+        import pandas as pd
+        cursor = connection.cursor(buffered=False)
+        frames = []
+        with metrics.timer("db_query_ms"):
+            cursor.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(FETCH_PAGE_SIZE)
+                if not rows:
+                    break
+                frames.append(pd.DataFrame(rows, columns=columns))
+        metrics.inc("db_queries_total")
+        cursor.close()
+        if not frames:
+            return pd.DataFrame(columns=columns)
+        frame = pd.concat(frames, ignore_index=True)
+        for column in columns[len(KEY_COLUMNS):]:
+            frame[column] = pd.to_numeric(frame[column])
+        return frame
+
+def parse_date(value):
+    return datetime.strptime(value, "%Y-%m-%d")
+
+def main():
+    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    parser = argparse.ArgumentParser(description="Print productivity reports for a warehouse.")
+    parser.add_argument("--warehouse", required=True)
+    parser.add_argument("--from", dest="start", type=parse_date, default=today - timedelta(days=7))
+    parser.add_argument("--to", dest="end", type=parse_date, default=today + timedelta(days=1))
+    parser.add_argument("--period", choices=PERIODS, default="day")
+    parser.add_argument("--csv", help="write the report to this CSV file instead of printing it")
+    args = parser.parse_args()
+
+    import pandas as pd
+    report = ReportEngine().build(args.warehouse, args.start, args.end, args.period)
+    if args.csv:
+        report.to_csv(args.csv, index=False)
+        print(f"Report written to '{args.csv}' ({len(report)} rows)")
+    else:
+        with pd.option_context("display.max_rows", None, "display.width", 200):
+            print(report.to_string(index=False))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+import time
+from collections import deque
+from metrics import metrics
+
+class Stopwatch:
+    """Measures elapsed time with the monotonic perf_counter_ns clock.
+
+    Wall-clock jumps (NTP, DST, manual changes) do not affect it, and it
+    knows nothing about the UI: the display only reads from it.
+    """
+
+    def __init__(self):
+        self._start_ns = None
+        self._elapsed_ns = 0
+
+    @property
+    def running(self):
+        return self._start_ns is not None
+
+    def start(self):
+        self._elapsed_ns = 0
+        self._start_ns = time.perf_counter_ns()
+
+    def stop(self):
+        """Stops the stopwatch and returns the elapsed nanoseconds."""
+        if self._start_ns is not None:
+            self._elapsed_ns = time.perf_counter_ns() - self._start_ns
+            self._start_ns = None
+        return self._elapsed_ns
+
+    def elapsed_ns(self):
+        if self._start_ns is None:
+            return self._elapsed_ns
+        return time.perf_counter_ns() - self._start_ns
+
+    def elapsed_ms(self):
+        return self.elapsed_ns() // 1_000_000
+
+class TickLoop:
+    """Calls a repaint callback through root.after at an adaptive rate.
+
+    The interval starts at min_interval ms and doubles (up to max_interval)
+    when ticks arrive late or the callback is slow, then creeps back down
+    once ticks are on time again. While the window is minimized no ticks
+    are scheduled at all. Lateness of every tick is kept for stats().
+    """
+
+    JITTER_SAMPLES = 1000
+    SLOW_TICK_FACTOR = 0.5       # tick je "pomalý", ak oneskorenie + práca > polovica intervalu
+    RECOVER_AFTER = 50           # počet včasných tickov pred zrýchlením
+
+    def __init__(self, root, callback, min_interval=33, max_interval=100):
+        self.root = root
+        self.callback = callback
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.interval = min_interval
+        self.running = False
+        self.paused = False
+        self._after_id = None
+        self._expected_ns = None
+        self._on_time = 0
+        self.jitter_ms = deque(maxlen=self.JITTER_SAMPLES)
+        self.ticks = 0
+        self.slow_ticks = 0
+        self.root.bind("<Unmap>", self._on_unmap, add="+")
+        self.root.bind("<Map>", self._on_map, add="+")
+
+    def start(self):
+        self.running = True
+        self.interval = self.min_interval
+        self._expected_ns = None
+        if not self.paused:
+            self._tick()
+
+    def stop(self):
+        self.running = False
+        self._cancel()
+
+    def stats(self):
+        """Returns tick count, slow ticks, current interval and jitter percentiles in ms."""
+        samples = sorted(self.jitter_ms)
+        def percentile(p):
+            return samples[min(len(samples) - 1, int(len(samples) * p / 100))] if samples else 0.0
+        return {
+            "ticks": self.ticks,
+            "slow_ticks": self.slow_ticks,
+            "interval_ms": self.interval,
+            "jitter_mean_ms": sum(samples) / len(samples) if samples else 0.0,
+            "jitter_p50_ms": percentile(50),
+            "jitter_p99_ms": percentile(99),
+            "jitter_max_ms": samples[-1] if samples else 0.0,
+        }
+
+    def _tick(self):
+        self._after_id = None
+        if not self.running or self.paused:
+            return
+        now = time.perf_counter_ns()
+        lateness_ms = 0.0
+        if self._expected_ns is not None:
+            lateness_ms = max(0.0, (now - self._expected_ns) / 1e6)
+            self.jitter_ms.append(lateness_ms)
+            metrics.observe("tick_lateness_ms", lateness_ms)
+            if lateness_ms >= self.interval:
+                metrics.inc("dropped_frames_total", int(lateness_ms // self.interval))
+        self.callback()
+        self.ticks += 1
+        work_ms = (time.perf_counter_ns() - now) / 1e6
+        metrics.observe("tick_work_ms", work_ms)
+
+        if lateness_ms + work_ms > self.interval * self.SLOW_TICK_FACTOR:
+            self.slow_ticks += 1
+            self._on_time = 0
+            self.interval = min(self.interval * 2, self.max_interval)
+        else:
+            self._on_time += 1
+            if self._on_time >= self.RECOVER_AFTER and self.interval > self.min_interval:
+                self._on_time = 0
+                self.interval = max(self.interval // 2, self.min_interval)
+
+        self._expected_ns = time.perf_counter_ns() + self.interval * 1_000_000
+        self._after_id = self.root.after(self.interval, self._tick)
+
+    def _cancel(self):
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+
+    def _on_unmap(self, event):
+        if event.widget is self.root:
+            self.paused = True
+            self._cancel()
+
+    def _on_map(self, event):
+        if event.widget is self.root and self.paused:
+            self.paused = False
+            self._expected_ns = None
+            if self.running:
+                self._tick()
@@ -1,14 +1,25 @@
 import tkinter as tk
-from tkinter import Menu, filedialog, ttk, messagebox
-from PIL import Image, ImageTk
-import time
+from tkinter import Menu, filedialog, ttk, messagebox, simpledialog
 import os
-import pandas as pd
-from datetime import datetime
-import mysql.connector
-from database import get_database_connection
-import requests
-import zipfile
+import time
+from datetime import datetime, timedelta
+from database import (pooled_connection, get_connection_pool, load_database_config, RecordPager,
+                      DatabaseConfigError, INSERT_CHUNK_SIZE)
+from background_tasks import BackgroundTasks
+from record_store import RecordStore, format_duration
+from reports import ReportEngine, PERIODS, REPORT_COLUMNS
+from journal import RecordJournal, JournalSyncer, write_to_database
+from stopwatch import Stopwatch, TickLoop
+from multi_timer import TimerBoard
+from exporter import export_rows, stream_history
+from console_log import ConsoleLog
+from metrics import metrics, EXPORT_INTERVAL
+
+DB_TIMEOUT = 15       # seconds before a DB task is reported as timed out
+DB_PROBE_TIMEOUT = 5
+STARTUP_DELAY = 50    # ms after the first frame before deferred startup work runs
+REPORT_TIMEOUT = 300
+UPDATE_TIMEOUT = 600   # whole download; each read has its own timeout
 
 class TimerApp:
     def prompt_update(self, latest_version):
@@ -17,37 +28,84 @@ class TimerApp:
             self.download_update()
 
     def download_update(self):
-        """Downloads and extracts the new version."""
-        url = "https://github.com/sakovitch/TimerApp/archive/refs/heads/main.zip"
-        try:
-            response = requests.get(url)
-            with open("update.zip", "wb") as file:
-                file.write(response.content)
-            with zipfile.ZipFile("update.zip", "r") as zip_ref:
-                zip_ref.extractall("update")
-            os.remove("update.zip")
-            messagebox.showinfo("Update", "The update has been downloaded successfully.")
-            self.update_console("New version downloaded. Restart the application to apply updates.", color="white")
-        except Exception as e:
-            messagebox.showerror("Update Error", f"Failed to download the update: {e}")
-            self.update_console(f"Error downloading update: {e}", color="red")
+        """Downloads, verifies and installs the new version in the background."""
+        self.update_console("Downloading update...", color="white")
+        from update_checker import install_update
+        self.update_progress_step = 0
+        self.tasks.submit(install_update, on_progress=self.report_update_progress,
+                          on_done=self.on_update_downloaded, on_error=self.on_update_failed,
+                          timeout=UPDATE_TIMEOUT, key="update", cancellable=True)
+
+    def report_update_progress(self, written, total):
+        """Worker callback: forwards download progress to the console in 10 % steps."""
+        step = written * 10 // total if total else 0
+        if step > self.update_progress_step:
+            self.update_progress_step = step
+            self.tasks.post(self.update_console, f"Update download {step * 10}%", "white")
+
+    def on_update_downloaded(self, changed):
+        messagebox.showinfo("Update", "The update has been downloaded successfully.")
+        self.update_console(f"New version installed ({len(changed)} files changed). "
+                            "Restart the application to apply updates.", color="white")
+
+    def on_update_failed(self, error):
+        messagebox.showerror("Update Error", f"Failed to download the update: {error}")
+        self.update_console(f"Error downloading update: {error}", color="red")
 
     def update_connection_status(self):
         """Displays database connection status and program version."""
-        try:
-            conn = get_database_connection()
-            conn.close()
-            self.status_label.config(text="Connected to DB ✔", fg="green")
-            self.update_console("Program is up-to-date.", color="green")
-        except Exception as e:
-            self.status_label.config(text="Not connected to DB ❗", fg="red")
-            self.update_console("Program is outdated or not connected to DB.", color="red")
+        self.tasks.submit(self.probe_database, on_done=self.on_connection_ok,
+                          on_error=self.on_connection_failed, timeout=DB_PROBE_TIMEOUT, key="db-status")
+
+    def probe_database(self):
+        """Worker: checks that a pooled connection (or the ingest daemon) is reachable."""
+        if self.ingest_url:
+            from ingest_daemon import check_health
+            check_health(self.ingest_url, timeout=DB_PROBE_TIMEOUT)
+            return
+        with pooled_connection():
+            pass
+
+    def send_to_daemon(self, rows, on_progress=None):
+        """Syncer sink for daemon mode: returns once the daemon has committed the rows."""
+        from ingest_daemon import post_records, POST_TIMEOUT
+        started = time.perf_counter()
+        post_records(self.ingest_url, rows, timeout=POST_TIMEOUT)
+        if on_progress:
+            elapsed = time.perf_counter() - started
+            on_progress(len(rows), len(rows), len(rows) / elapsed if elapsed > 0 else 0.0)
+
+    def report_save_progress(self, written, total, rate):
+        """Reports progress of a chunked save to the console; single-chunk saves stay quiet."""
+        if total > INSERT_CHUNK_SIZE:
+            self.update_console(f"Saved {written}/{total} records ({rate:.0f} rows/s)", color="white")
+
+    def on_connection_ok(self, _result):
+        self.status_label.config(text="Connected to DB ✔", fg="green")
+        self.update_console("Program is up-to-date.", color="green")
+
+    def on_connection_failed(self, error):
+        self.status_label.config(text="Not connected to DB ❗", fg="red")
+        if isinstance(error, DatabaseConfigError):
+            self.update_console(str(error), color="red")
+        self.update_console("Program is outdated or not connected to DB.", color="red")
+
+    def set_busy(self, busy):
+        """Shows or hides the busy indicator while background work is pending."""
+        self.busy_label.config(text="Working..." if busy else "")
+        self.root.config(cursor="watch" if busy else "")
+
+    def on_close(self):
+        self.close_multi_timer_panel()
+        self.syncer.stop()
+        self.tasks.shutdown()
+        self.journal.close()
+        self.console_log.close()
+        self.root.destroy()
 
     def update_console(self, message, color="white"):
         """Adds a message to the console with an optional color."""
-        self.console.insert(tk.END, f"{datetime.now().strftime('%H:%M:%S')} - {message}\n", ("color",))
-        self.console.tag_configure("color", foreground=color)
-        self.console.see(tk.END)
+        self.console_log.write(message, color)
 
     def __init__(self, root, warehouse):
         self.root = root
@@ -61,6 +119,7 @@ class TimerApp:
             'entry_bg': '#1E1E1E',
             'button_bg': '#2C2C2C',
             'active_bg': '#3C3C3C',
+            'synced_fg': '#9E9E9E',
             'font': 'Helvetica'
         }
 
@@ -75,14 +134,27 @@ class TimerApp:
         self.console = tk.Text(self.console_frame, wrap=tk.WORD, bg=self.colors['entry_bg'],
                                 fg=self.colors['fg'], font=(self.colors['font'], 10))
         self.console.pack(fill=tk.BOTH, expand=True)
+        self.console.config(yscrollcommand=self.on_console_scroll)
+        self.console_log = ConsoleLog(self.root, self.console)
+        self.records_pager = None
+        self.records_loading = False
 
         # Create the status label (appears above the console)
         self.status_label = tk.Label(self.console_frame, text="", font=(self.colors['font'], 10),
                                      bg=self.colors['entry_bg'], fg=self.colors['fg'])
         self.status_label.pack(side=tk.TOP, fill=tk.X, pady=2)
-        
-        # Now update connection status after console has been created
-        self.update_connection_status()
+
+        self.sync_label = tk.Label(self.console_frame, text="", font=(self.colors['font'], 10),
+                                   bg=self.colors['entry_bg'], fg=self.colors['fg'])
+        self.sync_label.pack(side=tk.TOP, fill=tk.X)
+
+        self.busy_label = tk.Label(self.console_frame, text="", font=(self.colors['font'], 10),
+                                   bg=self.colors['entry_bg'], fg=self.colors['fg'])
+        self.busy_label.pack(side=tk.TOP, fill=tk.X)
+
+        # All DB and network work runs on worker threads
+        self.tasks = BackgroundTasks(self.root, on_busy_change=self.set_busy)
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
 
         # Client buttons at the bottom of the console frame
         self.client_buttons_frame = tk.Frame(self.console_frame, bg=self.colors['entry_bg'])
@@ -102,19 +174,18 @@ class TimerApp:
                                         command=self.show_all_messages)
         all_messages_button.pack(side=tk.LEFT, padx=2)
 
+        load_more_button = tk.Button(self.client_buttons_frame, text="Load More", font=(self.colors['font'], 10),
+                                     bg=self.colors['button_bg'], fg=self.colors['fg'],
+                                     activebackground=self.colors['active_bg'],
+                                     command=self.load_more_records)
+        load_more_button.pack(side=tk.LEFT, padx=2)
+
         # Right panel: logo, version, warehouse info, and timer controls
         right_panel = tk.Frame(main_frame, bg=self.colors['bg'])
         right_panel.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True, padx=5, pady=5)
 
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        logo_path = os.path.join(script_dir, "logo.webp")
-        logo_image = Image.open(logo_path)
-        logo_photo = ImageTk.PhotoImage(logo_image)
-        self.root.iconphoto(False, logo_photo)
-
-        # Logo widget
-        self.logo_label = tk.Label(right_panel, image=logo_photo, bg=self.colors['bg'])
-        self.logo_label.image = logo_photo
+        # Logo widget; the image itself is loaded after the first frame
+        self.logo_label = tk.Label(right_panel, bg=self.colors['bg'])
         self.logo_label.pack(pady=10)
 
         # Version label under the logo
@@ -152,8 +223,9 @@ class TimerApp:
         self.activity_frame = tk.Frame(right_panel, bg=self.colors['bg'])
         self.activity_frame.pack(pady=10)
 
+        self.activities = ["Packing", "Work", "Other"]
         self.radio_buttons = []
-        for activity in ["Packing", "Work", "Other"]:
+        for activity in self.activities:
             rb = tk.Radiobutton(self.activity_frame, text=activity,
                                 variable=self.activity_var, value=activity,
                                 font=(self.colors['font'], 12), bg=self.colors['bg'], fg=self.colors['fg'],
@@ -193,17 +265,79 @@ class TimerApp:
                                        command=self.export_to_excel)
         self.export_button.pack(side=tk.LEFT, padx=5)
 
+        self.export_history_button = tk.Button(self.buttons_frame, text="Export History", font=(self.colors['font'], 10),
+                                               bg=self.colors['button_bg'], fg=self.colors['fg'],
+                                               activebackground=self.colors['active_bg'],
+                                               command=self.export_history)
+        self.export_history_button.pack(side=tk.LEFT, padx=5)
+
         self.save_button = tk.Button(self.buttons_frame, text="Save to Database", font=(self.colors['font'], 10),
                                      bg=self.colors['button_bg'], fg=self.colors['fg'],
                                      activebackground=self.colors['active_bg'],
                                      command=self.save_to_database)
         self.save_button.pack(side=tk.LEFT, padx=5)
 
+        self.reports_button = tk.Button(self.buttons_frame, text="Reports", font=(self.colors['font'], 10),
+                                        bg=self.colors['button_bg'], fg=self.colors['fg'],
+                                        activebackground=self.colors['active_bg'],
+                                        command=self.open_reports_panel)
+        self.reports_button.pack(side=tk.LEFT, padx=5)
+        self.reports = ReportEngine()
+
+        self.diagnostics_button = tk.Button(self.buttons_frame, text="Diagnostics", font=(self.colors['font'], 10),
+                                            bg=self.colors['button_bg'], fg=self.colors['fg'],
+                                            activebackground=self.colors['active_bg'],
+                                            command=self.open_diagnostics_panel)
+        self.diagnostics_button.pack(side=tk.LEFT, padx=5)
+
+        self.timers_button = tk.Button(self.buttons_frame, text="Timers", font=(self.colors['font'], 10),
+                                       bg=self.colors['button_bg'], fg=self.colors['fg'],
+                                       activebackground=self.colors['active_bg'],
+                                       command=self.open_multi_timer_panel)
+        self.timers_button.pack(side=tk.LEFT, padx=5)
+        self.multi_timer_panel = None
+        self.timer_board = None
+
         self.is_running = False
-        self.start_time = None
         self.elapsed_time = 0
+        self.stopwatch = Stopwatch()
+        self.tick_loop = TickLoop(self.root, self.update_timer)
+        self.displayed_time = None
+        self.record_store = RecordStore()
+
+        # Každý zastavený časovač sa najprv zapíše do lokálneho žurnálu
+        self.journal = RecordJournal()
+        self.last_sync_error = None
+        # Priamy zápis do MySQL, alebo cez ingest_daemon.py, ak je nastavené ingest_url
+        self.ingest_url = load_database_config()["ingest_url"]
+        self.syncer = JournalSyncer(self.journal, on_status=lambda stats: self.tasks.post(self.on_sync_status, stats),
+                                    sink=self.send_to_daemon if self.ingest_url else write_to_database,
+                                    on_progress=lambda *progress: self.tasks.post(self.report_save_progress,
+                                                                                  *progress))
         self.update_console("Application started", color="white")
 
+        # Everything not needed for the first frame runs once the window is up. Idle callbacks run
+        # after Tk's pending redraws, so the delay counts from the first paint, not from mainloop()
+        self.root.after_idle(lambda: self.root.after(STARTUP_DELAY, self.deferred_startup))
+
+    def deferred_startup(self):
+        """Loads the logo, probes the DB and starts the journal syncer."""
+        self.load_logo()
+        self.update_connection_status()
+        self.syncer.start()
+        if metrics.enabled:
+            self.root.after(EXPORT_INTERVAL, self.export_metrics)
+
+    def load_logo(self):
+        from PIL import Image, ImageTk
+        script_dir = os.path.dirname(os.path.abspath(__file__))
+        logo_path = os.path.join(script_dir, "logo.webp")
+        logo_image = Image.open(logo_path)
+        logo_photo = ImageTk.PhotoImage(logo_image)
+        self.root.iconphoto(False, logo_photo)
+        self.logo_label.config(image=logo_photo)
+        self.logo_label.image = logo_photo
+
     def on_activity_change(self, *args):
         if self.activity_var.get() == "Other":
             self.custom_activity_entry.config(state='normal')
@@ -222,33 +356,48 @@ class TimerApp:
     def start_timer(self):
         self.is_running = True
         self.start_button.config(text="Stop Timer")
-        self.start_time = time.time()
-        self.update_timer()
+        self.stopwatch.start()
+        self.tick_loop.start()
         self.update_console("Timer started", color="white")
 
     def stop_timer(self):
         self.is_running = False
+        self.tick_loop.stop()
         self.start_button.config(text="Start/Reset Timer")
-        formatted_time = self.format_time(int(self.elapsed_time * 1000))
+        elapsed_ns = self.stopwatch.stop()
+        self.elapsed_time = elapsed_ns / 1e9
+        duration_ms = elapsed_ns // 1_000_000
+        self.update_timer()
+        self.record_stopped_timers([(self.selected_client.get(), self.current_activity(), duration_ms)])
+
+    def current_activity(self):
+        """Returns the selected activity, or the custom text when 'Other' is selected."""
         activity = self.activity_var.get()
         if activity == "Other":
             activity = self.custom_activity_entry.get() or "Other"
-        client = self.selected_client.get()
-        current_datetime = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        self.records_listbox.insert(tk.END, f"{current_datetime} - {client} - {activity}: {formatted_time}")
-        self.update_console(f"Timer stopped: {client} - {activity}: {formatted_time}", color="white")
+        return activity
+
+    def record_stopped_timers(self, timers):
+        """Adds (client, activity, duration_ms) entries to the session and journals them in one commit."""
+        if not timers:
+            return
+        records = [self.record_store.add(client, activity, duration_ms) for client, activity, duration_ms in timers]
+        self.records_listbox.insert(tk.END, *(self.record_store.display_text(record) for record in records))
+        self.journal.append_many([self.journal_row(record) for record in records])
+        self.syncer.sync_now()
+        for client, activity, duration_ms in timers:
+            self.update_console(f"Timer stopped: {client} - {activity}: {self.format_time(duration_ms)}",
+                                color="white")
 
     def update_timer(self):
-        if self.is_running:
-            self.elapsed_time = time.time() - self.start_time
-            formatted_time = self.format_time(int(self.elapsed_time * 1000))
+        """Repaints the time label; scheduling is done by self.tick_loop."""
+        formatted_time = self.format_time(self.stopwatch.elapsed_ms())
+        if formatted_time != self.displayed_time:
+            self.displayed_time = formatted_time
             self.time_label.config(text=formatted_time)
-            self.root.after(10, self.update_timer)
 
     def format_time(self, milliseconds):
-        total_seconds, milliseconds = divmod(milliseconds, 1000)
-        minutes, seconds = divmod(total_seconds, 60)
-        return f"{minutes}:{seconds:02}:{milliseconds:03}"
+        return format_duration(milliseconds)
 
     def show_context_menu(self, event):
         try:
@@ -261,111 +410,363 @@ class TimerApp:
     def delete_record(self):
         selected_indices = self.records_listbox.curselection()
         if selected_indices:
+            record = self.record_store.remove(selected_indices[0])
             self.records_listbox.delete(selected_indices[0])
+            # Záznam už je v žurnáli, takže zmazanie sa posiela ako tombstone
+            self.journal.append(self.journal_row(record, deleted=True))
+            self.syncer.sync_now()
             self.update_console("Record deleted", color="white")
 
-    def export_to_excel(self):
-        current_date = datetime.now().strftime("%Y-%m-%d")
-        default_filename = f"EXPORT {current_date}.xlsx"
-        file_path = filedialog.asksaveasfilename(
+    def journal_row(self, record, deleted=False):
+        """Builds the journal/DB row for a record."""
+        when, client, activity, duration_ms = next(self.record_store.rows((record,)))
+        return (record.uid, when, client, activity, format_duration(duration_ms), duration_ms,
+                self.warehouse, int(deleted))
+
+    def ask_export_path(self, title, default_filename):
+        return filedialog.asksaveasfilename(
             defaultextension=".xlsx",
-            filetypes=[("Excel files", "*.xlsx")],
-            title="Save Excel File",
+            filetypes=[("Excel files", "*.xlsx"), ("CSV files", "*.csv"), ("Parquet files", "*.parquet")],
+            title=title,
             initialfile=default_filename
         )
+
+    def export_to_excel(self):
+        """Exports the current session's records."""
+        current_date = datetime.now().strftime("%Y-%m-%d")
+        file_path = self.ask_export_path("Save Excel File", f"EXPORT {current_date}.xlsx")
         if not file_path:
             return
-
-        data = []
-        for item in self.records_listbox.get(0, tk.END):
-            try:
-                datetime_str, rest = item.split(' - ', 1)
-                client, rest = rest.split(' - ', 1)
-                activity, duration = rest.split(': ', 1)
-                data.append([datetime_str, client, activity, duration])
-            except ValueError:
-                self.update_console(f"Invalid record format: {item}", color="white")
-                continue
-
-        df = pd.DataFrame(data, columns=['Date and Time', 'Client', 'Activity', 'Duration'])
-        writer = pd.ExcelWriter(file_path, engine='xlsxwriter')
-        df.to_excel(writer, sheet_name='Records', index=False, startrow=1)
-        workbook = writer.book
-        worksheet = writer.sheets['Records']
-        header_format = workbook.add_format({'bold': True, 'font_size': 14})
-        worksheet.write('A1', f'Warehouse - {self.warehouse}', header_format)
-        worksheet.set_column('A:A', 20)
-        worksheet.set_column('B:B', 15)
-        worksheet.set_column('C:C', 15)
-        worksheet.set_column('D:D', 15)
-        writer.close()
-        self.update_console(f"Data exported to '{file_path}'", color="white")
+        rows = [(when, client, activity, duration_ms, format_duration(duration_ms))
+                for when, client, activity, duration_ms in self.record_store.rows()]
+        self.run_export(rows, file_path)
+
+    def export_history(self):
+        """Streams the warehouse's stored history for a date range to a file."""
+        today = datetime.now().date()
+        start = simpledialog.askstring("Export History", "From (YYYY-MM-DD):",
+                                       initialvalue=str(today.replace(day=1)), parent=self.root)
+        end = start and simpledialog.askstring("Export History", "To (YYYY-MM-DD, exclusive):",
+                                               initialvalue=str(today + timedelta(days=1)), parent=self.root)
+        if not end:
+            return
+        try:
+            start = datetime.strptime(start, "%Y-%m-%d")
+            end = datetime.strptime(end, "%Y-%m-%d")
+        except ValueError:
+            messagebox.showerror("Export History", "Dates must be in YYYY-MM-DD format.")
+            return
+        file_path = self.ask_export_path("Export History",
+                                         f"HISTORY {self.warehouse} {start:%Y-%m-%d} {end:%Y-%m-%d}.xlsx")
+        if file_path:
+            self.run_export(stream_history(self.warehouse, start, end), file_path)
+
+    def run_export(self, rows, file_path):
+        self.update_console(f"Exporting to '{file_path}'...", color="white")
+        self.tasks.submit(export_rows, rows, file_path, self.warehouse,
+                          on_progress=lambda count: self.tasks.post(
+                              self.update_console, f"Exported {count} rows...", "white"),
+                          on_done=lambda count: self.update_console(
+                              f"Data exported to '{file_path}' ({count} rows)", color="white"),
+                          on_error=lambda error: self.update_console(f"Error exporting data: {error}", color="red"),
+                          key="export", cancellable=True)
 
     def save_to_database(self):
-        data = []
-        for item in self.records_listbox.get(0, tk.END):
-            try:
-                datetime_str, rest = item.split(' - ', 1)
-                client, rest = rest.split(' - ', 1)
-                activity, time_val = rest.split(': ', 1)
-                data.append([datetime_str, client, activity, time_val])
-            except ValueError:
-                self.update_console(f"Invalid record format: {item}", color="white")
-                continue
+        """Stopped timers are journaled and synced automatically; this forces a sync now.
 
-        if not data:
+        Only journal entries past the sync offset are sent, and they are
+        upserted by record uid, so pressing Save repeatedly never duplicates.
+        """
+        depth = self.journal.depth()
+        if not depth:
             self.update_console("No data to save", color="white")
             return
-
-        try:
-            connection = get_database_connection()
-            cursor = connection.cursor()
-            for row in data:
-                query = """
-                INSERT INTO records (datetime, client, activity, duration, warehouse)
-                VALUES (%s, %s, %s, %s, %s)
-                """
-                cursor.execute(query, (row[0], row[1], row[2], row[3], self.warehouse))
-            connection.commit()
-            self.update_console("Data successfully saved to database", color="white")
-            self.update_connection_status()
-        except mysql.connector.Error as error:
-            self.update_console(f"Error saving data: {error}", color="red")
+        self.update_console(f"Syncing {depth} journaled records to database...", color="white")
+        self.syncer.sync_now()
+
+    def on_sync_status(self, stats):
+        """Shows journal queue depth and sync throughput next to the DB status, and new sync errors."""
+        text = f"Queue: {stats['depth']}"
+        if stats['rate']:
+            text += f" | {stats['rate']:.0f} rows/s"
+        self.sync_label.config(text=text)
+        if stats['error']:
             self.status_label.config(text="Not connected to DB ❗", fg="red")
-        finally:
-            if 'connection' in locals() and connection.is_connected():
-                cursor.close()
-                connection.close()
+            # Opakovaná rovnaká chyba sa nevypisuje pri každom pokuse znova
+            if stats['error'] != self.last_sync_error:
+                self.update_console(f"Error saving data: {stats['error']}", color="red")
+        elif stats['batch']:
+            self.status_label.config(text="Connected to DB ✔", fg="green")
+            self.reports.invalidate(self.warehouse)
+            for index in self.record_store.mark_synced(stats['uids']):
+                self.records_listbox.itemconfig(index, fg=self.colors['synced_fg'])
+            for (_uid, when, client, activity, duration, *_rest), error in stats['rejected']:
+                self.update_console(f"Record rejected by database: {when} - {client} - {activity}: {duration} "
+                                    f"({error}). It was kept in the journal's dead_letter table.", color="red")
+            if not stats['depth']:
+                self.update_console(f"Data successfully saved to database ({stats['synced']} records this session)",
+                                    color="white")
+        self.last_sync_error = stats['error']
+
+    def open_reports_panel(self):
+        """Opens a window with aggregated productivity reports for this warehouse."""
+        panel = tk.Toplevel(self.root, bg=self.colors['bg'])
+        panel.title(f"Reports - {self.warehouse}")
+
+        controls = tk.Frame(panel, bg=self.colors['bg'])
+        controls.pack(fill=tk.X, padx=10, pady=5)
+        today = datetime.now().date()
+        period_var = tk.StringVar(value=PERIODS[0])
+        start_var = tk.StringVar(value=str(today - timedelta(days=7)))
+        end_var = tk.StringVar(value=str(today + timedelta(days=1)))
+        for text, widget in (
+            ("Period:", ttk.Combobox(controls, textvariable=period_var, values=PERIODS, state='readonly', width=8)),
+            ("From:", tk.Entry(controls, textvariable=start_var, width=12)),
+            ("To:", tk.Entry(controls, textvariable=end_var, width=12)),
+        ):
+            tk.Label(controls, text=text, bg=self.colors['bg'], fg=self.colors['fg']).pack(side=tk.LEFT, padx=2)
+            widget.pack(side=tk.LEFT, padx=2)
+
+        table = ttk.Treeview(panel, columns=REPORT_COLUMNS, show='headings', height=20)
+        for column in REPORT_COLUMNS:
+            table.heading(column, text=column)
+            table.column(column, width=90, anchor='w' if column in ("period", "client", "activity") else 'e')
+        table.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+
+        def run():
+            try:
+                start = datetime.strptime(start_var.get(), "%Y-%m-%d")
+                end = datetime.strptime(end_var.get(), "%Y-%m-%d")
+            except ValueError:
+                messagebox.showerror("Reports", "Dates must be in YYYY-MM-DD format.", parent=panel)
+                return
+            self.tasks.submit(self.reports.build, self.warehouse, start, end, period_var.get(),
+                              on_done=lambda report: self.render_report(table, report),
+                              on_error=lambda error: self.update_console(f"Error building report: {error}", color="red"),
+                              timeout=REPORT_TIMEOUT, key="report")
+
+        tk.Button(controls, text="Run", bg=self.colors['button_bg'], fg=self.colors['fg'],
+                  activebackground=self.colors['active_bg'], command=run).pack(side=tk.LEFT, padx=5)
+
+    def open_multi_timer_panel(self):
+        """Opens a window with independent timers, each with its own client and activity.
+
+        All timers share one TickLoop (see multi_timer.TimerBoard), which only
+        repaints the rows scrolled into view.
+        """
+        if self.multi_timer_panel is not None:
+            self.multi_timer_panel.lift()
+            return
+        panel = self.multi_timer_panel = tk.Toplevel(self.root, bg=self.colors['bg'])
+        panel.title(f"Timers - {self.warehouse}")
+        panel.protocol("WM_DELETE_WINDOW", self.close_multi_timer_panel)
+        self.timer_board = TimerBoard(panel)
+        self.board_rows = {}
+
+        controls = tk.Frame(panel, bg=self.colors['bg'])
+        controls.pack(side=tk.TOP, fill=tk.X, padx=10, pady=5)
+        for text, command in (("Add Timer", self.add_board_timer), ("Stop All", self.stop_all_board_timers)):
+            tk.Button(controls, text=text, font=(self.colors['font'], 10), bg=self.colors['button_bg'],
+                      fg=self.colors['fg'], activebackground=self.colors['active_bg'],
+                      command=command).pack(side=tk.LEFT, padx=5)
+
+        canvas = tk.Canvas(panel, bg=self.colors['bg'], highlightthickness=0, width=560, height=420)
+        scrollbar = tk.Scrollbar(panel, orient=tk.VERTICAL, command=canvas.yview)
+
+        def on_scroll(first, last):
+            scrollbar.set(first, last)
+            self.timer_board.set_visible(first, last)
+
+        canvas.config(yscrollcommand=on_scroll)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(10, 0), pady=5)
+        self.board_frame = tk.Frame(canvas, bg=self.colors['bg'])
+        canvas.create_window((0, 0), window=self.board_frame, anchor='nw')
+        self.board_frame.bind("<Configure>", lambda event: canvas.config(scrollregion=canvas.bbox(tk.ALL)))
+        self.add_board_timer()
+
+    def add_board_timer(self):
+        """Adds a stopped timer row, preset to the main window's client and activity."""
+        row = tk.Frame(self.board_frame, bg=self.colors['bg'])
+        row.pack(side=tk.TOP, fill=tk.X, pady=2)
+        label = tk.Label(row, text=self.format_time(0), width=10, font=(self.colors['font'], 16),
+                         bg=self.colors['bg'], fg=self.colors['fg'])
+        label.pack(side=tk.LEFT, padx=5)
+        slot = self.timer_board.add(self.selected_client.get(), self.current_activity(), label)
+
+        client_var = tk.StringVar(value=slot.client)
+        client_var.trace_add('write', lambda *args: setattr(slot, 'client', client_var.get()))
+        ttk.Combobox(row, textvariable=client_var, values=self.clients, state='readonly',
+                     width=12).pack(side=tk.LEFT, padx=2)
+        # Aktivita sa dá vybrať alebo napísať vlastná (ako "Other" v hlavnom okne)
+        activity_var = tk.StringVar(value=slot.activity)
+        activity_var.trace_add('write', lambda *args: setattr(slot, 'activity', activity_var.get() or "Other"))
+        ttk.Combobox(row, textvariable=activity_var, values=self.activities, width=12).pack(side=tk.LEFT, padx=2)
+
+        button = tk.Button(row, text="Start", width=6, font=(self.colors['font'], 10), bg=self.colors['button_bg'],
+                           fg=self.colors['fg'], activebackground=self.colors['active_bg'],
+                           command=lambda: self.toggle_board_timer(slot))
+        button.pack(side=tk.LEFT, padx=2)
+        tk.Button(row, text="Remove", font=(self.colors['font'], 10), bg=self.colors['button_bg'],
+                  fg=self.colors['fg'], activebackground=self.colors['active_bg'],
+                  command=lambda: self.remove_board_timer(slot)).pack(side=tk.LEFT, padx=2)
+        self.board_rows[slot] = (row, button)
+
+    def toggle_board_timer(self, slot):
+        row, button = self.board_rows[slot]
+        if slot.running:
+            duration_ms = self.timer_board.stop(slot)
+            button.config(text="Start")
+            self.record_stopped_timers([(slot.client, slot.activity, duration_ms)])
+        else:
+            self.timer_board.start(slot)
+            button.config(text="Stop")
+
+    def stop_all_board_timers(self):
+        """Stops every running timer and journals them together."""
+        stopped = self.timer_board.stop_all()
+        for slot, _duration_ms in stopped:
+            self.board_rows[slot][1].config(text="Start")
+        self.record_stopped_timers([(slot.client, slot.activity, duration_ms) for slot, duration_ms in stopped])
+
+    def remove_board_timer(self, slot):
+        """Removes a timer row; a running timer is stopped and recorded first."""
+        if slot.running:
+            self.toggle_board_timer(slot)
+        self.timer_board.remove(slot)
+        self.board_rows.pop(slot)[0].destroy()
+
+    def close_multi_timer_panel(self):
+        """Records any still-running timers, then closes the panel."""
+        if self.multi_timer_panel is None:
+            return
+        self.stop_all_board_timers()
+        self.multi_timer_panel.destroy()
+        self.multi_timer_panel = None
+        self.timer_board = None
+
+    def collect_gauges(self):
+        """Copies pool, journal and tick-loop state into metric gauges."""
+        for name, value in get_connection_pool().stats.items():
+            metrics.set_gauge(f"pool_{name}", value)
+        metrics.set_gauge("journal_depth", self.syncer.stats["depth"])
+        metrics.set_gauge("tick_interval_ms", self.tick_loop.interval)
+
+    def export_metrics(self):
+        """Periodically writes the metrics textfile and JSON on a worker thread."""
+        self.collect_gauges()
+        self.tasks.submit(metrics.write_files,
+                          on_error=lambda error: self.update_console(f"Error writing metrics: {error}", color="red"))
+        self.root.after(EXPORT_INTERVAL, self.export_metrics)
+
+    def open_diagnostics_panel(self):
+        """Opens a window with live counters and latency percentiles."""
+        panel = tk.Toplevel(self.root, bg=self.colors['bg'])
+        panel.title("Diagnostics")
+        text = tk.Text(panel, width=80, height=30, bg=self.colors['entry_bg'], fg=self.colors['fg'],
+                       font=("Courier", 10))
+        text.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+
+        def refresh():
+            if not panel.winfo_exists():
+                return
+            if not metrics.enabled:
+                lines = ["Instrumentation is disabled (TIMERAPP_METRICS=0)."]
+            else:
+                self.collect_gauges()
+                snapshot = metrics.snapshot()
+                lines = ["Counters:"]
+                lines += [f"  {name:<32} {value}" for name, value in sorted(snapshot["counters"].items())]
+                lines.append("Gauges:")
+                lines += [f"  {name:<32} {value}" for name, value in sorted(snapshot["gauges"].items())]
+                lines.append(f"Latency (ms):{'count':>27}{'mean':>9}{'p50':>8}{'p90':>8}{'p99':>8}")
+                for name, h in sorted(snapshot["histograms"].items()):
+                    mean = h["sum_ms"] / h["count"] if h["count"] else 0.0
+                    lines.append(f"  {name:<32} {h['count']:>6} {mean:>8.1f} {h['p50_ms']:>7} "
+                                 f"{h['p90_ms']:>7} {h['p99_ms']:>7}")
+                loops = [("Timer loop", self.tick_loop)]
+                if self.timer_board is not None:
+                    loops.append(("Multi-timer loop", self.timer_board.tick_loop))
+                for title, loop in loops:
+                    lines.append(f"{title}: " + ", ".join(f"{k}={v:.2f}" if isinstance(v, float) else f"{k}={v}"
+                                                          for k, v in loop.stats().items()))
+            text.delete(1.0, tk.END)
+            text.insert(tk.END, "\n".join(lines))
+            panel.after(1000, refresh)
+
+        refresh()
+
+    def render_report(self, table, report):
+        if not table.winfo_exists():
+            return
+        table.delete(*table.get_children())
+        for row in report.itertuples(index=False):
+            table.insert('', tk.END, values=[
+                value if column in ("period", "client", "activity", "count") else format_duration(int(value))
+                for column, value in zip(REPORT_COLUMNS, row)])
+        self.update_console(f"Report built: {len(report)} rows", color="white")
 
     def show_client_records(self, client, clear_console=True):
-        if clear_console:
-            self.console.delete(1.0, tk.END)
-        try:
-            connection = get_database_connection()
-            cursor = connection.cursor()
-            query = """
-            SELECT datetime, activity, duration FROM records
-            WHERE client = %s AND warehouse = %s
-            ORDER BY datetime DESC
-            """
-            cursor.execute(query, (client, self.warehouse))
-            records = cursor.fetchall()
-            self.update_console(f"Records for client {client} in warehouse {self.warehouse}:", color="white")
-            if records:
-                for record in records:
-                    self.update_console(f"{record[0]} - {record[1]}: {record[2]}", color="white")
-            else:
-                self.update_console("No records found.", color="white")
-        except mysql.connector.Error as error:
-            self.update_console(f"Error loading records: {error}", color="red")
-            self.status_label.config(text="Not connected to DB ❗", fg="red")
-        finally:
-            if 'connection' in locals() and connection.is_connected():
-                cursor.close()
-                connection.close()
+        self.open_records_view([client], f"Records for client {client} in warehouse {self.warehouse}:",
+                               clear_console)
 
     def show_all_messages(self):
-        self.console.delete(1.0, tk.END)
-        self.update_console("Displaying all messages:", color="white")
-        for client in self.clients:
-            self.show_client_records(client, clear_console=False)
+        """Shows the history of all clients with one query, grouped by client."""
+        self.open_records_view(sorted(self.clients), "Displaying all messages:")
+
+    def open_records_view(self, clients, title, clear_console=True):
+        """Starts a paged records view; further pages load as the console is scrolled."""
+        self.close_records_view()
+        if clear_console:
+            self.console_log.clear()
+        self.update_console(title, color="white")
+        self.records_pager = RecordPager(self.warehouse, clients)
+        self.records_last_client = None
+        self.load_more_records()
+
+    def close_records_view(self):
+        pager, self.records_pager = self.records_pager, None
+        self.records_loading = False
+        if pager is not None:
+            self.tasks.cancel("records")
+            pager.close()
+
+    def load_more_records(self, event=None):
+        """Fetches the next page of the open records view, if any."""
+        pager = self.records_pager
+        if pager is None or pager.exhausted or self.records_loading:
+            return
+        self.records_loading = True
+        self.tasks.submit(pager.fetch_page,
+                          on_done=lambda rows: self.render_records_page(pager, rows),
+                          on_error=self.on_records_failed, timeout=DB_TIMEOUT, key="records", cancellable=True)
+
+    def render_records_page(self, pager, rows):
+        if pager is not self.records_pager:
+            return
+        self.records_loading = False
+        for client, record_datetime, activity, duration_ms, duration in rows:
+            if client != self.records_last_client:
+                self.records_last_client = client
+                self.console_log.insert(f"--- {client} ---\n")
+            if duration_ms is not None:
+                duration = format_duration(duration_ms)
+            self.console_log.insert(f"{record_datetime} - {activity}: {duration}\n")
+        self.console_log.flush()
+        if pager.exhausted:
+            if not pager.rows_fetched:
+                self.update_console("No records found.", color="white")
+            self.records_pager = None
+        else:
+            self.on_console_scroll(*self.console.yview())
+
+    def on_console_scroll(self, first, last):
+        """Loads the next page once the end of the console comes into view."""
+        if float(last) >= 1.0:
+            self.load_more_records()
+
+    def on_records_failed(self, error):
+        self.records_loading = False
+        self.records_pager = None
+        self.update_console(f"Error loading records: {error}", color="red")
+        self.status_label.config(text="Not connected to DB ❗", fg="red")
@@ -1,14 +1,266 @@
-import requests
+import json
+import os
+import re
+import shutil
+import zlib
 
-def check_for_update(current_version):
-    url = "https://api.github.com/repos/sakovitch/TimerApp/releases/latest"  # URL na GitHub API pre najnovší release
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+UPDATE_DIR = os.path.join(APP_DIR, "update")
+# URL na GitHub API pre najnovší release; dá sa presmerovať na lokálny server s testovacími releasmi
+UPDATE_API_URL = os.environ.get("TIMERAPP_UPDATE_API",
+                                "https://api.github.com/repos/sakovitch/TimerApp/releases/latest")
+CHUNK_SIZE = 64 * 1024
+DOWNLOAD_TIMEOUT = 30
+SWAP_MANIFEST = "swap.json"  # existuje len počas výmeny súborov
+
+class UpdateError(Exception):
+    pass
+
+def _cache_path():
+    return os.path.join(UPDATE_DIR, "release_cache.json")
+
+def fetch_latest_release(timeout=5, api_url=None):
+    """Returns the latest release JSON, revalidated with a cached ETag (If-None-Match)."""
+    import urllib.error
+    import urllib.request
+    api_url = api_url or UPDATE_API_URL
+    cache = {}
+    if os.path.exists(_cache_path()):
+        with open(_cache_path(), encoding="utf-8") as file:
+            cache = json.load(file)
+    request = urllib.request.Request(api_url, headers={"Accept": "application/vnd.github+json"})
+    if cache.get("url") == api_url and cache.get("etag"):
+        request.add_header("If-None-Match", cache["etag"])
     try:
-        response = requests.get(url)
-        response.raise_for_status()
-        latest_version = response.json()["tag_name"]  # Získa názov tagu (napr. "v1.1")
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            release = json.loads(response.read())
+            etag = response.headers.get("ETag")
+    except urllib.error.HTTPError as error:
+        if error.code == 304 and "release" in cache:
+            return cache["release"]
+        raise
+    if etag:
+        os.makedirs(UPDATE_DIR, exist_ok=True)
+        with open(_cache_path(), "w", encoding="utf-8") as file:
+            json.dump({"url": api_url, "etag": etag, "release": release}, file)
+    return release
+
+def check_for_update(current_version, timeout=5):
+    try:
+        latest_version = fetch_latest_release(timeout)["tag_name"]  # Získa názov tagu (napr. "v1.1")
         if latest_version != current_version:
             return latest_version
         return None
     except Exception as e:
         print(f"Error checking for updates: {e}")
         return None
+
+def release_archive(release, timeout=10):
+    """Returns (zip URL, expected SHA-256) for a release.
+
+    The checksum comes from a "<archive>.sha256" asset next to a .zip asset,
+    or from a "sha256: <hex>" line in the release notes for the zipball.
+    Releases without a checksum are refused.
+    """
+    import urllib.request
+    assets = {asset["name"]: asset["browser_download_url"] for asset in release.get("assets", [])}
+    for name, url in assets.items():
+        if name.endswith(".zip") and f"{name}.sha256" in assets:
+            with urllib.request.urlopen(assets[f"{name}.sha256"], timeout=timeout) as response:
+                return url, response.read().decode("ascii").split()[0].lower()
+    match = re.search(r"sha256[:=]\s*([0-9a-fA-F]{64})", release.get("body") or "")
+    if match and release.get("zipball_url"):
+        return release["zipball_url"], match.group(1).lower()
+    raise UpdateError(f"Release {release.get('tag_name')} has no SHA-256 checksum")
+
+def _check_cancelled(cancel_event):
+    from concurrent.futures import CancelledError
+    if cancel_event is not None and cancel_event.is_set():
+        raise CancelledError("Update cancelled")
+
+def download_file(url, path, expected_sha256, timeout=DOWNLOAD_TIMEOUT, on_progress=None, cancel_event=None):
+    """Streams url to path in chunks, resuming a previous partial download with a Range request.
+
+    The data is hashed while it is written and only renamed to path if the
+    SHA-256 matches; a mismatching download is deleted. A cancelled
+    download keeps its .part file, so the next attempt resumes it.
+    """
+    import hashlib
+    import urllib.error
+    import urllib.request
+    part_path = path + ".part"
+    digest = hashlib.sha256()
+    offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+    request = urllib.request.Request(url)
+    if offset:
+        request.add_header("Range", f"bytes={offset}-")
+    try:
+        response = urllib.request.urlopen(request, timeout=timeout)
+    except urllib.error.HTTPError as error:
+        if error.code != 416:
+            raise
+        response = None  # server nemá čo doplniť, časť je už celá
+    try:
+        if response is not None and response.status != 206:
+            offset = 0  # server Range nepodporuje, sťahuje sa odznova
+        if offset:
+            with open(part_path, "rb") as file:
+                for chunk in iter(lambda: file.read(CHUNK_SIZE), b""):
+                    digest.update(chunk)
+        if response is not None:
+            total = offset + int(response.headers.get("Content-Length", 0))
+            written = offset
+            with open(part_path, "ab" if offset else "wb") as file:
+                for chunk in iter(lambda: response.read(CHUNK_SIZE), b""):
+                    _check_cancelled(cancel_event)
+                    file.write(chunk)
+                    digest.update(chunk)
+                    written += len(chunk)
+                    if on_progress:
+                        on_progress(written, total)
+    finally:
+        if response is not None:
+            response.close()
+    if digest.hexdigest() != expected_sha256.lower():
+        os.remove(part_path)
+        raise UpdateError("Downloaded update failed SHA-256 verification")
+    os.replace(part_path, path)
+    return path
+
+def _file_crc(path):
+    crc = 0
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(CHUNK_SIZE), b""):
+            crc = zlib.crc32(chunk, crc)
+    return crc
+
+def stage_update(zip_path, staging_dir, app_dir=APP_DIR):
+    """Extracts only files that differ from app_dir into staging_dir; returns their relative paths."""
+    import zipfile
+    if os.path.exists(staging_dir):
+        shutil.rmtree(staging_dir)
+    os.makedirs(staging_dir)
+    changed = []
+    with zipfile.ZipFile(zip_path) as archive:
+        members = [info for info in archive.infolist() if not info.is_dir()]
+        # GitHub archívy majú všetko v jednom koreňovom priečinku (napr. "TimerApp-main/")
+        roots = {info.filename.split("/", 1)[0] for info in members}
+        strip = len(roots) == 1 and all("/" in info.filename for info in members)
+        for info in members:
+            relative = info.filename.split("/", 1)[1] if strip else info.filename
+            parts = relative.split("/")
+            if relative.startswith("/") or ".." in parts or ":" in parts[0]:
+                raise UpdateError(f"Unsafe path in update archive: {info.filename}")
+            target = os.path.join(app_dir, *parts)
+            if (os.path.isfile(target) and os.path.getsize(target) == info.file_size
+                    and _file_crc(target) == info.CRC):
+                continue
+            staged = os.path.join(staging_dir, *parts)
+            os.makedirs(os.path.dirname(staged), exist_ok=True)
+            with archive.open(info) as source, open(staged, "wb") as destination:
+                shutil.copyfileobj(source, destination, CHUNK_SIZE)
+            changed.append(relative)
+    return changed
+
+def _write_manifest(path, manifest):
+    with open(path + ".tmp", "w", encoding="utf-8") as file:
+        json.dump(manifest, file)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(path + ".tmp", path)
+
+def _move_staged(manifest):
+    """Moves every file still in staging into place; files already moved are skipped."""
+    for relative in manifest["changed"]:
+        parts = relative.split("/")
+        staged = os.path.join(manifest["staging_dir"], *parts)
+        if os.path.exists(staged):
+            target = os.path.join(manifest["app_dir"], *parts)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            os.replace(staged, target)
+
+def _roll_back(manifest):
+    """Restores backed-up files and deletes files the update added."""
+    for relative in manifest["changed"]:
+        parts = relative.split("/")
+        target = os.path.join(manifest["app_dir"], *parts)
+        if relative in manifest["existed"]:
+            shutil.copy2(os.path.join(manifest["backup_dir"], *parts), target + ".restore")
+            os.replace(target + ".restore", target)
+        elif os.path.exists(target):
+            os.remove(target)
+
+def apply_staged_update(staging_dir, changed, app_dir=APP_DIR, backup_dir=None):
+    """Swaps staged files into app_dir so that an interrupted swap can always be completed.
+
+    Every file to be replaced is backed up first, then a swap manifest is
+    written (fsynced); only then are the files moved in with os.replace.
+    The manifest is removed once the last file is in place. An error during
+    the swap rolls everything back; if the process dies instead,
+    recover_interrupted_update() finishes the swap on the next start.
+    """
+    update_dir = os.path.dirname(staging_dir)
+    manifest_path = os.path.join(update_dir, SWAP_MANIFEST)
+    recover_interrupted_update(update_dir)  # záloha z prerušenej výmeny sa nesmie zmazať skôr
+    backup_dir = backup_dir or os.path.join(update_dir, "backup")
+    if os.path.exists(backup_dir):
+        shutil.rmtree(backup_dir)
+    existed = []
+    for relative in changed:
+        parts = relative.split("/")
+        target = os.path.join(app_dir, *parts)
+        if os.path.exists(target):
+            backup = os.path.join(backup_dir, *parts)
+            os.makedirs(os.path.dirname(backup), exist_ok=True)
+            shutil.copy2(target, backup)
+            existed.append(relative)
+    manifest = {"app_dir": app_dir, "staging_dir": staging_dir, "backup_dir": backup_dir,
+                "changed": changed, "existed": existed}
+    _write_manifest(manifest_path, manifest)
+    try:
+        _move_staged(manifest)
+    except OSError:
+        _roll_back(manifest)
+        os.remove(manifest_path)
+        raise
+    os.remove(manifest_path)
+    shutil.rmtree(staging_dir, ignore_errors=True)
+
+def recover_interrupted_update(update_dir=None):
+    """Completes a swap cut short by a crash or power loss; call before importing app modules.
+
+    Returns "finished" if the remaining staged files were moved in,
+    "rolled back" if that failed and the backups were restored, or None if
+    no swap was interrupted.
+    """
+    manifest_path = os.path.join(update_dir or UPDATE_DIR, SWAP_MANIFEST)
+    if not os.path.exists(manifest_path):
+        return None
+    with open(manifest_path, encoding="utf-8") as file:
+        manifest = json.load(file)
+    try:
+        _move_staged(manifest)
+        result = "finished"
+    except OSError:
+        _roll_back(manifest)
+        result = "rolled back"
+    os.remove(manifest_path)
+    return result
+
+def install_update(on_progress=None, app_dir=APP_DIR, api_url=None, cancel_event=None):
+    """Downloads, verifies, stages and applies the latest release; returns the changed files.
+
+    Cancelling stops the download between chunks; nothing is swapped in
+    once cancel_event is set.
+    """
+    release = fetch_latest_release(api_url=api_url)
+    url, sha256 = release_archive(release)
+    os.makedirs(UPDATE_DIR, exist_ok=True)
+    zip_path = os.path.join(UPDATE_DIR, f"{release['tag_name']}.zip")
+    download_file(url, zip_path, sha256, on_progress=on_progress, cancel_event=cancel_event)
+    staging_dir = os.path.join(UPDATE_DIR, "staging")
+    changed = stage_update(zip_path, staging_dir, app_dir)
+    _check_cancelled(cancel_event)
+    apply_staged_update(staging_dir, changed, app_dir)
+    os.remove(zip_path)
+    return changed